@@ -6,6 +6,11 @@ conf.py:
     configuration file that provides important values and definitions.
 """
 
+from pathlib import Path
+
+# root of repository, files shared by web app, CGI scripts and tools are found from it whatever their working directory
+root_path = Path(__file__).resolve().parent.parent
+
 # database connection credentials
 host = 'localhost'
 user = 'root'
@@ -19,9 +24,82 @@ num_regions = 16
 emailregex = r"([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\"([]!#-[^-~ \t]|(\\[\t -~]))+\")@([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\[[\t -Z^-~]*])"
 phoneregex = r"^\+(?:[0-9] ?){10}[0-9]$"
 
-# datetime expected format
+# datetime expected format, and format of dates alone
 datetimeformat = '%Y-%m-%d %H:%M'
+dateformat = '%Y-%m-%d'
 
 # image file boundaries
 maxfilesize = 2 * 1024 * 1024
 mimevalid = ['image/png', 'image/jpeg']
+maxfilecount = 5
+# bytes of a text field, and of a whole event submission, room left for text fields and multipart headers
+maxfieldsize = 64 * 1024
+maxrequestsize = maxfilecount * maxfilesize + 1024 * 1024
+# bytes read from an image before checking its type, enough for every signature filetype knows
+magicsize = 261
+
+# database connection pool, connections per worker process and seconds to wait for one
+pool_size = 5
+pool_timeout = 10
+# seconds a connection may stay idle in pool before being checked on checkout
+pool_ping_after = 30
+
+# seconds regions, comunas, food types and social networks are cached before querying them again
+reference_ttl = 600
+
+# seconds total event count is cached, registrations in same process keep it up to date meanwhile
+event_count_ttl = 30
+
+# file holding data version, bumped on every event registration to invalidate cached responses
+data_version_path = str(root_path / 'media' / '.data-version')
+# cache policy of read-only responses, clients revalidate them with their ETag
+cache_control = 'public, no-cache'
+# maximum number of responses kept in memory by a long-lived worker
+response_cache_size = 128
+
+# uploaded images are copied to disk in chunks of this size, retrying a failed copy a few times
+save_chunk_size = 64 * 1024
+save_attempts = 3
+
+# directory of uploaded images as foto rows keep it and web server serves it, relative to repository root,
+# directory where they're stored on disk, and seconds an unreferenced image is kept before being collected
+media_path = 'media'
+media_root = str(root_path / media_path)
+media_grace_period = 60 * 60
+
+# downscaled variants generated for every uploaded image, by width in pixels and format
+variant_widths = [160, 480, 960]
+variant_formats = ['webp', 'jpeg']
+variant_quality = 80
+# seconds variant worker waits when there are no pending jobs
+variant_poll_interval = 5
+
+# events per page of a search, by default and at most
+search_page_size = 20
+search_max_page_size = 100
+
+# latest events returned with a map view, by default and at most, and largest radius in kilometers of a view
+nearby_page_size = 20
+nearby_max_page_size = 100
+nearby_max_radius = 1000
+
+# latest events of every comuna in a map summary, by default and at most
+summary_events_per_comuna = 3
+summary_max_events_per_comuna = 10
+
+# log a summary of queries of every request, flagging queries slower than this many seconds
+# and statements a method repeats this many times in a request
+query_log = False
+slow_query_seconds = 0.1
+repeated_query_count = 5
+
+# file where every process adds up its metrics, and seconds a long-lived worker keeps them in memory before
+metrics_path = str(root_path / 'metrics' / 'metrics.json')
+metrics_flush_interval = 10
+
+# events read per query while a listing is streamed, and characters of response written at once
+stream_batch_size = 500
+stream_chunk_size = 64 * 1024
+
+# encoded events kept in memory by a long-lived worker, reused while data version doesn't change
+event_cache_size = 10000
@@ -3,18 +3,49 @@
 
 import cgi
 import cgitb
-import json
+import os
+import sys
 
-from urlparamhandler import URLParamHandler
+from conf import cache_control
+from db import data_version
+from httpcache import cache_key, etag, not_modified
+from metrics import cache_lookup, request_type, track_request
+from querylog import request_log
+from streaming import encode_chunks
+from urlparamhandler import URLParamHandler, request_types
 
 cgitb.enable()
 utf8stdout = open(1, 'w', encoding='utf-8', closefd=False)
 
 query_params = cgi.FieldStorage()
-handler = URLParamHandler(query_params)
-response = handler.response
 
-print('Content-type: application/json; charset=UTF-8')
-print('')
+with track_request('/cgi-bin/dataAPI.py', request_type(request_types, query_params.getfirst('type', ''))) as request:
+    # read-only requests carry a validator, clients holding current response skip database entirely
+    key = cache_key(query_params)
+    tag = etag(key, data_version()) if key is not None else None
 
-print(json.dumps(response), file=utf8stdout)
+    client_holds = bool(tag) and not_modified(os.environ.get('HTTP_IF_NONE_MATCH'), tag)
+    if tag:
+        cache_lookup('etag', client_holds)
+
+    if client_holds:
+        request.status = '304'
+        print('Status: 304 Not Modified')
+        print(f'ETag: {tag}')
+        print(f'Cache-Control: {cache_control}')
+        print('')
+    else:
+        with request_log(f"dataAPI.py?{os.environ.get('QUERY_STRING', '')}"):
+            handler = URLParamHandler(query_params, stream=True)  # events without a limit are read as written
+            response = handler.response
+
+            print('Content-type: application/json; charset=UTF-8')
+            if tag:
+                print(f'ETag: {tag}')
+                print(f'Cache-Control: {cache_control}')
+            print('')
+            sys.stdout.flush()
+
+            for chunk in encode_chunks(response):
+                utf8stdout.write(chunk)
+            print('', file=utf8stdout)
@@ -1,20 +1,274 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
-import hashlib
 import os
+import threading
+import time
 from cgi import FieldStorage
-from datetime import datetime
+from collections import OrderedDict
+from datetime import timedelta
 from pathlib import Path
-from typing import List, Tuple, Any, Union, Dict, Optional
+from typing import List, Tuple, Any, Union, Dict, Optional, Callable, FrozenSet, Set, Sequence, Iterator
 from urllib.parse import urlparse
-from copy import deepcopy
+from weakref import WeakKeyDictionary
 
 import mysql.connector
 
 import query as qr
-from conf import num_regions, datetimeformat
-from utils import resolve_hostname
+from conf import num_regions, datetimeformat, dateformat, reference_ttl, event_count_ttl, data_version_path, \
+    search_page_size, search_max_page_size, nearby_page_size, nearby_max_page_size, nearby_max_radius, \
+    summary_events_per_comuna, summary_max_events_per_comuna, stream_batch_size, event_cache_size
+from media import store_image
+from metrics import round_trip, cache_lookup, cache_lookups
+from pool import get_pool
+from querylog import instrumented
+from serializer import EncodedEvent
+from utils import resolve_hostname, encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor, \
+    parse_datetime, box_around, clamp_box, format_datetimes
+
+
+class ReferenceData:
+    """
+    Snapshot of reference tables, regions, comunas and accepted enum values.
+
+    Besides the rows as queried, lookup dictionaries are precomputed so that
+    translating a comuna name into its id or checking that a comuna belongs
+    to a region doesn't require a query nor a linear search.
+    """
+
+    def __init__(self,
+                 regions: List[Tuple],
+                 comunas: List[Tuple],
+                 food_types: List[str],
+                 social_networks: List[str]):
+        """
+        Constructor of ReferenceData.
+
+        :param regions:
+            region rows as (id, name).
+        :param comunas:
+            comuna rows as (id, name, region id).
+        :param food_types:
+            food type options accepted by database.
+        :param social_networks:
+            social network options accepted by database.
+        """
+
+        self.regions = regions
+        self.comunas = comunas
+        self.food_types = food_types
+        self.social_networks = social_networks
+
+        # region name -> id and id -> name
+        self.region_ids: Dict[str, int] = {name: region_id for region_id, name in regions}
+        region_names: Dict[int, str] = {region_id: name for region_id, name in regions}
+
+        # comuna id -> (comuna name, region name)
+        self.comuna_locations: Dict[int, Tuple[str, str]] = {
+            comuna_id: (name, region_names[region_id]) for comuna_id, name, region_id in comunas
+        }
+
+        # (region name, comuna name) -> id, a comuna name alone may be shared by different regions
+        self.region_comuna_ids: Dict[Tuple[str, str], int] = {
+            (region_names[region_id], name): comuna_id for comuna_id, name, region_id in comunas
+        }
+
+        # comuna name -> id, a name shared by comunas of different regions keeps lowest id as database does
+        self.comuna_ids: Dict[str, int] = {}
+        # comuna name -> names of regions having a comuna with that name
+        self.comuna_regions: Dict[str, FrozenSet[str]] = {}
+        for comuna_id, name, region_id in sorted(comunas):
+            self.comuna_ids.setdefault(name, comuna_id)
+            self.comuna_regions[name] = self.comuna_regions.get(name, frozenset()) | {region_names[region_id]}
+
+        self.food_type_set: FrozenSet[str] = frozenset(food_types)
+
+
+class TTLCache:
+    """
+    Process wide cache of values with expiration time.
+
+    Values that rarely change, or that can be slightly outdated, are
+    queried once and reused by every database handler of the process
+    until the entry expires or it is explicitly invalidated.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        """
+        Constructor of TTLCache.
+
+        :param name:
+            name of cache in metrics.
+        :param ttl:
+            seconds a cached entry is considered valid.
+        """
+
+        self.name = name
+        self._ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}  # schema -> (expiration, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Get cached value, loading it when missing or expired.
+
+        :param key:
+            schema whose value is requested.
+        :param loader:
+            function that queries value from database.
+
+        :return:
+            value cached for schema.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = bool(entry) and entry[0] > time.monotonic()
+            cache_lookup(self.name, hit)
+            if hit:
+                return entry[1]
+
+            value = loader()
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            return value
+
+    def update(self, key: str, function: Callable[[Any], Any]) -> None:
+        """
+        Modify a cached value that hasn't expired, keeping its expiration.
+
+        :param key:
+            schema whose value is modified.
+        :param function:
+            function receiving cached value and returning the new one.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries[key] = (entry[0], function(entry[1]))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop cached values, forcing them to be queried again on next use.
+
+        :param key:
+            schema to invalidate, if None every schema is invalidated.
+        """
+
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class EventCache:
+    """
+    Process wide cache of encoded events for current data version.
+
+    An event doesn't change once registered, except for variants added to its
+    images later, which bumps data version, so the whole cache is emptied once
+    data version changes. Entries are evicted least recently used first.
+    """
+
+    def __init__(self, size: int):
+        """
+        Constructor of EventCache.
+
+        :param size:
+            maximum number of events kept.
+        """
+
+        self._size = size
+        self._version = None
+        self._entries: OrderedDict[Tuple[str, int], EncodedEvent] = OrderedDict()  # (schema, id) -> event
+        self._lock = threading.Lock()
+
+    def get(self, database: str, event_ids: List[int], version: str) -> Dict[int, EncodedEvent]:
+        """
+        :return:
+            encoded events cached for data version, by id, events not cached are left out.
+        """
+
+        events = {}
+        with self._lock:
+            if version == self._version:
+                for event_id in event_ids:
+                    event = self._entries.get((database, event_id))
+                    if event is not None:
+                        self._entries.move_to_end((database, event_id))
+                        events[event_id] = event
+
+        cache_lookups.inc('event', 'hit', amount=len(events))
+        cache_lookups.inc('event', 'miss', amount=len(event_ids) - len(events))
+        return events
+
+    def put(self, database: str, events: List[EncodedEvent], version: str) -> None:
+        """
+        Keep encoded events for data version.
+        """
+
+        with self._lock:
+            if version != self._version:  # stale events are dropped all at once
+                self._entries.clear()
+                self._version = version
+
+            for event in events:
+                self._entries[(database, event.event_id)] = event
+                self._entries.move_to_end((database, event.event_id))
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+
+# reference data, event count and encoded events shared by every handler of current process
+_reference_cache = TTLCache(name='reference', ttl=reference_ttl)
+_count_cache = TTLCache(name='event_count', ttl=event_count_ttl)
+_event_cache = EventCache(size=event_cache_size)
+
+# prepared cursors by query, for every pooled connection, dropped with connection
+_prepared_cursors: 'WeakKeyDictionary[Any, Dict[str, Any]]' = WeakKeyDictionary()
+
+
+def invalidate_reference_data(database: Optional[str] = None) -> None:
+    """
+    Invalidate cached regions, comunas, food types and social networks.
+
+    :param database:
+        schema to invalidate, if None every schema is invalidated.
+    """
+
+    _reference_cache.invalidate(database)
+
+
+def data_version() -> str:
+    """
+    :return:
+        current version of events data, shared by every process through a file.
+    """
+
+    try:
+        return Path(data_version_path).read_text().strip() or '0'
+    except FileNotFoundError:
+        return '0'
+
+
+def bump_data_version() -> str:
+    """
+    Change version of events data, responses built from previous version become stale.
+
+    :return:
+        new version of events data.
+    """
+
+    version = f'{time.time_ns():x}{os.getpid():x}'
+
+    path = Path(data_version_path)
+    path.parent.mkdir(parents=True, exist_ok=True)  # nothing may have been uploaded yet
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    temp_path.write_text(version)
+    os.replace(temp_path, path)  # atomic, readers see either old or new version
+
+    return version
 
 
 class EventDatabase:
@@ -33,7 +287,7 @@ class EventDatabase:
                  password: str,
                  database: str):
         """
-        Constructor of EventDatabase.
+        Constructor of EventDatabase, takes a connection from process pool.
 
         :param host:
             IP address that is serving the database.
@@ -49,28 +303,70 @@ class EventDatabase:
         self.host = host
         self.database = database
 
-        # connection to database
-        self.cnx = mysql.connector.connect(user=user,
-                                           password=password,
-                                           host=host,
-                                           database=database)
+        # connection to database, checked out from pool shared by every handler
+        self._pool = get_pool(host=host, user=user, password=password, database=database)
+        self.cnx = self._pool.checkout()
         # cursor to execute queries to database
         self.cursor = self.cnx.cursor()
 
-    def _static_query(self, query: str) -> List:
+    def close(self) -> None:
         """
-        Perform a query with no parameters to database.
+        Close cursor and give back connection to pool, handler can't be used afterwards.
+        """
+
+        if self.cnx is None:
+            return
+
+        try:
+            self.cursor.close()  # prepared cursors stay with connection for next checkout
+        except mysql.connector.Error:
+            pass
+        finally:
+            self._pool.checkin(self.cnx)
+            self.cnx = None
+            self.cursor = None
+
+    def __enter__(self) -> 'EventDatabase':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @instrumented
+    def _static_query(self, query: str, params: Sequence[Any] = ()) -> List:
+        """
+        Perform a read query to database as a prepared statement.
+
+        Every connection keeps a prepared cursor per query, so a query run again
+        on same connection only sends its parameters.
 
         :param query:
-            string that represents the static query.
+            string that represents the query, with a placeholder per parameter.
+        :param params:
+            values of query parameters.
         :return:
             database response to given query as a list of tuples.
         """
 
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        cursors = _prepared_cursors.setdefault(self.cnx, {})
+        cursor = cursors.get(query)
+        if cursor is None:
+            cursor = cursors[query] = self.cnx.cursor(prepared=True)
+
+        cursor.execute(query, tuple(params))
+        round_trip()
+        return cursor.fetchall()
+
+    def _event_ids_query(self, query: Callable[[int], str], event_ids: List[int]) -> List:
+        """
+        Perform a read query over a list of event ids, padded to the size of a prepared statement.
+        """
+
+        size = qr.id_list_size(len(event_ids))
+        return self._static_query(query(size), event_ids + [event_ids[-1]] * (size - len(event_ids)))
 
-    def _dynamic_query(self, query: str, data: Tuple[Any, ...]) -> int:
+    @instrumented
+    def _dynamic_query(self, query: str, data: Tuple[Any, ...], commit: bool = True) -> int:
         """
         Perform a query expected to modify database.
 
@@ -78,60 +374,192 @@ class EventDatabase:
             string representing query to database.
         :param data:
             data for query as a tuple.
+        :param commit:
+            whether to commit transaction, if False following queries join it.
 
         :return:
             id of table-row where query inserted data.
         """
 
         self.cursor.execute(query, data)
-        self.cnx.commit()
+        if commit:
+            self.cnx.commit()
+        round_trip(2 if commit else 1)
         return self.cursor.lastrowid
 
-    def get_events(self, limit: Optional[int] = None, offset: Optional[int] = None) -> Dict:
+    @instrumented
+    def _batch_query(self, query: str, rows: List[Tuple[Any, ...]], commit: bool = False) -> None:
+        """
+        Perform a query expected to modify database once for every row, sent as a batch.
+
+        :param query:
+            string representing query to database.
+        :param rows:
+            data for every run of query, as tuples.
+        :param commit:
+            whether to commit transaction, if False following queries join it.
+        """
+
+        self.cursor.executemany(query, rows)
+        if commit:
+            self.cnx.commit()
+        round_trip(2 if commit else 1)
+
+    def _update_statistics(self,
+                           open_date: str,
+                           food_type: str,
+                           comuna_id: int,
+                           images: int,
+                           commit: bool = False) -> None:
+        """
+        Add an event to statistics tables.
+
+        :param open_date:
+            start datetime of event, as submitted.
+        :param food_type:
+            food type of event.
+        :param comuna_id:
+            id of comuna where event takes place.
+        :param images:
+            number of images of event.
+        :param commit:
+            whether to commit transaction once statistics are added, if False following queries join it.
+        """
+
+        early, midday, evening = daytime_counts(open_date)
+
+        self._dynamic_query(qr.update_day_statistics, (open_date, 1, 1), commit=False)
+        self._dynamic_query(qr.update_food_type_statistics, (food_type, 1, 1), commit=False)
+        self._dynamic_query(qr.update_month_daytime_statistics, (
+            open_date[:7], early, midday, evening, early, midday, evening
+        ), commit=False)
+        self._dynamic_query(qr.update_comuna_images_statistics, (comuna_id, images, images), commit=False)
+        self._dynamic_query(qr.update_comuna_events_statistics, (comuna_id, 1, 1), commit=commit)
+
+    def rebuild_statistics(self) -> None:
+        """
+        Recompute statistics tables from registered events, in a single transaction.
+        """
+
+        try:
+            for query in qr.rebuild_statistics:
+                self.cursor.execute(query)
+            self.cnx.commit()
+        except mysql.connector.Error:
+            self.cnx.rollback()
+            raise
+
+        bump_data_version()
+
+    def get_events(self,
+                   limit: Optional[int] = None,
+                   offset: Optional[int] = None,
+                   after: Optional[str] = None,
+                   with_count: bool = True,
+                   stream: bool = False) -> Dict:
         """
         Retrieve events from database, limit and offset can be set for query.
 
+        Instead of an offset, a cursor returned as next by a previous call can be
+        given, then rows are searched from the last event of that page on using the
+        (dia_hora_inicio, id) index, rather than read and discarded.
+
+        Without a limit, events can be streamed: data is then an iterator reading
+        events in batches as it's consumed, and handler must stay open meanwhile.
+
         :param limit:
             maximum number of rows to retrieve, if None retrieve every row.
         :param offset:
             number of rows to skip from response.
+        :param after:
+            cursor of last event already seen, if given offset is ignored.
+        :param with_count:
+            whether to include total number of events in response.
+        :param stream:
+            whether to read events as data is iterated, if no limit is set.
 
         :return:
-            dictionary with events data formatted and event count.
+            dictionary with events data formatted, event count and, if limit is set, cursor of next page.
         """
 
-        db_events = self._static_query(qr.events(limit=limit, offset=offset))  # query events from db
-        cleaned_events = self.__get_cleaned_events(db_events)  # clean and order events data
-
-        return {
+        try:
+            limit = int(limit) if limit else None
+            offset = int(offset) if offset else 0
+        except ValueError:
+            limit = offset = -1
+        if (limit is not None and limit < 0) or offset < 0:
+            return {'response': 'Debe ingresar un límite y desplazamiento válidos.'}
+
+        sort_key = None
+        if after:
+            sort_key = decode_cursor(after)
+            if not sort_key:
+                return {'response': 'Debe ingresar un cursor válido.'}
+
+        if stream and not limit:
+            cleaned_events = self.__stream_events(offset, sort_key)  # read as response is written
+        elif sort_key:
+            start_date, event_id = sort_key
+            db_events = self._static_query(qr.events_after, (start_date, start_date, event_id, limit or qr.all_rows))
+            cleaned_events = self.__get_cleaned_events(db_events)
+        else:
+            db_events = self._static_query(qr.events, (limit or qr.all_rows, offset))  # query events from db
+            cleaned_events = self.__get_cleaned_events(db_events)  # clean and order events data
+
+        response = {
             'count': self.event_count,
             'data': cleaned_events
+        } if with_count else {
+            'data': cleaned_events
         }
 
-    def get_events_by_comuna(self, comuna_name: Optional[str]) -> Dict:
+        if limit:  # cursor of next page, None when there are no more events
+            last_page = len(db_events) < limit
+            response['next'] = None if last_page else encode_cursor(db_events[-1][6], db_events[-1][0])
+
+        return response
+
+    def get_events_by_comuna(self,
+                             comuna_name: Optional[str],
+                             with_count: bool = True,
+                             limit: Optional[str] = None) -> Dict:
         """
-        Retrieve events from database that take place in a specific comuna.
+        Retrieve events from database that take place in a specific comuna, latest first.
 
         :param comuna_name:
             comuna's name where events are queried.
+        :param with_count:
+            whether to include total number of events in response.
+        :param limit:
+            maximum number of events to retrieve, if None retrieve every event of comuna.
 
         :return:
             all events data reported for a certain comuna.
         """
 
-        valid_comunas = self.get_comunas(name_only=True)  # get valid comunas
-        flatten_comunas = [comuna for region_comunas in valid_comunas for comuna in region_comunas]  # flatten list
+        reference = self.reference_data  # valid comunas
 
-        if not (comuna_name and comuna_name in flatten_comunas):  # check if name is not None and is valid
+        if not (comuna_name and comuna_name in reference.comuna_ids):  # check if name is not None and is valid
+            valid_comunas = self.get_comunas(name_only=True)
+            flatten_comunas = [comuna for region_comunas in valid_comunas for comuna in region_comunas]  # flatten list
             return {'response': 'Debe ingresar un nombre de comuna válido.', 'comunas': flatten_comunas}
 
-        comuna_id = self._static_query(qr.comuna_id_by_name(comuna_name=comuna_name))[0][0]
-        db_events = self._static_query(qr.events_by_comuna_id(comuna_id))
+        try:
+            limit = int(limit) if limit else qr.all_rows
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return {'response': 'Debe ingresar un límite válido.'}
+
+        comuna_id = reference.comuna_ids[comuna_name]
+        db_events = self._static_query(qr.events_by_comuna_id, (comuna_id, limit))
         cleaned_events = self.__get_cleaned_events(db_events)
 
         return {
             'count': self.event_count,
             'data': cleaned_events
+        } if with_count else {
+            'data': cleaned_events
         }
 
     def get_event_by_id(self, event_id: Optional[int]):
@@ -145,47 +573,378 @@ class EventDatabase:
             data of event cleaned for readability.
         """
 
-        valid_ids = self.get_events_ids()
-        flatten_ids = [event_id for event in valid_ids for event_id in event]  # flatten list
+        db_event = self._static_query(qr.event_by_id, (event_id,)) if event_id else []
 
-        if not (event_id and event_id in flatten_ids):  # check if id is not None and is valid
+        if not db_event:  # check if id is not None and is valid
             return {'response': 'Debe ingresar un id valido'}
 
-        db_event = self._static_query(qr.event_by_id(event_id=event_id))
         cleaned_event = self.__get_cleaned_events(db_event)
 
         return {
-            'count': self.event_count,
+            'count': len(cleaned_event),  # total of events would be meaningless for a single event
             'data': cleaned_event
         }
 
-    def __get_cleaned_events(self, db_events: List[Tuple]) -> List[Dict]:
+    def search_events(self,
+                      text: Optional[str],
+                      region: Optional[str] = None,
+                      comuna: Optional[str] = None,
+                      food_type: Optional[str] = None,
+                      start: Optional[str] = None,
+                      end: Optional[str] = None,
+                      limit: Optional[str] = None,
+                      after: Optional[str] = None) -> Dict:
         """
-        Get events data in a cleaner manner.
+        Search events by name, description and sector, most relevant first.
+
+        Text is matched with the FULLTEXT index of evento, and results can be
+        narrowed by region, comuna, food type and range of start dates. Pages are
+        requested with the cursor returned as next, there's no total count since
+        it would require reading every match.
+
+        :param text:
+            words searched.
+        :param region:
+            name of region events take place in.
+        :param comuna:
+            name of comuna events take place in.
+        :param food_type:
+            food type of events.
+        :param start:
+            earliest start date of events, as a date or datetime.
+        :param end:
+            latest start date of events, included, as a date or datetime.
+        :param limit:
+            events per page, search_page_size by default and search_max_page_size at most.
+        :param after:
+            cursor of last event already seen.
+
+        :return:
+            dictionary with events data formatted and cursor of next page.
+        """
+
+        if not (text and text.strip()):
+            return {'response': 'Debe ingresar un texto de búsqueda.'}
+
+        reference = self.reference_data
+        filters, filter_params = [], []
+
+        if region:
+            if region not in reference.region_ids:
+                return {'response': 'Debe ingresar un nombre de región válido.'}
+            filters.append('region')
+            filter_params.append(reference.region_ids[region])
+
+        if comuna:
+            if comuna not in reference.comuna_ids:
+                return {'response': 'Debe ingresar un nombre de comuna válido.'}
+            filters.append('comuna')
+            filter_params.append(comuna)
+
+        if food_type:
+            if food_type not in reference.food_type_set:
+                return {'response': 'Debe ingresar un tipo de comida válido.'}
+            filters.append('food_type')
+            filter_params.append(food_type)
+
+        for name, value in (('start', start), ('end', end)):
+            if not value:
+                continue
+            date = parse_datetime(value, datetimeformat) or parse_datetime(value, dateformat)
+            if not date:
+                return {'response': 'Debe ingresar fechas con formato AAAA-MM-DD o AAAA-MM-DD HH:MM.'}
+            if name == 'end':  # end date is included, up to its last minute or last day
+                date += timedelta(days=1) if len(value.strip()) <= 10 else timedelta(minutes=1)
+            filters.append(name)
+            filter_params.append(date.strftime(datetimeformat))
+
+        try:
+            limit = min(int(limit), search_max_page_size) if limit else search_page_size
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return {'response': 'Debe ingresar un límite válido.'}
+
+        params = [text, text, *filter_params]
+        if after:
+            sort_key = decode_search_cursor(after)
+            if not sort_key:
+                return {'response': 'Debe ingresar un cursor válido.'}
+            relevance, event_id = sort_key
+            params += [text, relevance, text, relevance, event_id]
+        params.append(limit)
+
+        db_events = self._static_query(qr.search_events(tuple(filters), bool(after)), params)
+        last_page = len(db_events) < limit
+
+        return {
+            'data': self.__get_cleaned_events(db_events),
+            'next': None if last_page else encode_search_cursor(db_events[-1][10], db_events[-1][0])
+        }
+
+    def get_events_nearby(self,
+                          lat: Optional[str] = None,
+                          lng: Optional[str] = None,
+                          radius: Optional[str] = None,
+                          bbox: Optional[str] = None,
+                          limit: Optional[str] = None) -> Dict:
+        """
+        Retrieve event counts per comuna and latest events in a map view, in a single call.
+
+        A view is either a circle, given by its center and radius, or a box. Comunas
+        are searched with the spatial index of their location, and counts are read
+        from summary tables, so cost doesn't grow with number of events.
+
+        :param lat:
+            latitude of center of circle, in degrees.
+        :param lng:
+            longitude of center of circle, in degrees.
+        :param radius:
+            radius of circle, in kilometers.
+        :param bbox:
+            box as 'south,west,north,east' in degrees, used if no circle is given.
+        :param limit:
+            number of latest events, nearby_page_size by default and nearby_max_page_size at most.
+
+        :return:
+            dictionary with event and image count of every comuna in view, total of events in view
+            and latest events data formatted.
+        """
+
+        try:
+            limit = min(int(limit), nearby_max_page_size) if limit else nearby_page_size
+            if lat or lng or radius:
+                lat, lng, radius = float(lat), float(lng), float(radius)
+                if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius <= nearby_max_radius):
+                    raise ValueError
+                comunas_query, events_query = qr.comunas_near, qr.events_near
+                params = [*box_around(lat, lng, radius), lng, lat, radius * 1000]
+            else:
+                south, west, north, east = (float(bound) for bound in (bbox or '').split(','))
+                if not (south < north and west < east):
+                    raise ValueError
+                comunas_query, events_query = qr.comunas_in_box, qr.events_in_box
+                params = [*clamp_box(west, south, east, north)]
+        except (ValueError, TypeError):
+            return {'response': 'Debe ingresar lat, lng y radius (km), o bbox (sur,oeste,norte,este) válidos.'}
+        if limit <= 0:
+            return {'response': 'Debe ingresar un límite válido.'}
+
+        locations = self.reference_data.comuna_locations
+        comunas = []
+        for comuna_id, comuna_lat, comuna_lng, events, images in self._static_query(comunas_query, params):
+            comuna, region = locations[comuna_id]
+            comunas.append({
+                'comuna': comuna,
+                'region': region,
+                'lat': comuna_lat,
+                'lng': comuna_lng,
+                'count': events,
+                'images': images
+            })
+
+        db_events = self._static_query(events_query, [*params, limit]) if comunas else []
+
+        return {
+            'comunas': comunas,
+            'count': sum(comuna['count'] for comuna in comunas),
+            'data': self.__get_cleaned_events(db_events)
+        }
+
+    def get_events_summary(self,
+                           comunas: Optional[List[str]] = None,
+                           region: Optional[str] = None,
+                           bbox: Optional[str] = None,
+                           per_comuna: Optional[str] = None) -> Dict:
+        """
+        Retrieve a summary of every comuna in a set, grouped by region, in a single call.
+
+        Every comuna with events comes with its event and image count, read from
+        summary tables, and its latest events, each comuna limited on its own so a
+        busy comuna doesn't crowd out the rest.
+
+        :param comunas:
+            names of comunas, of every region unless region is given.
+        :param region:
+            name of region that comunas belong to.
+        :param bbox:
+            box as 'south,west,north,east' in degrees, comunas located in it are used if no names are given.
+        :param per_comuna:
+            latest events per comuna, summary_events_per_comuna by default and summary_max_events_per_comuna
+            at most.
+
+        :return:
+            dictionary with counts, coordinates and latest events data of every comuna, and counts of every
+            region and in total.
+        """
+
+        reference = self.reference_data
+
+        try:
+            per_comuna = min(int(per_comuna), summary_max_events_per_comuna) if per_comuna else \
+                summary_events_per_comuna
+        except ValueError:
+            per_comuna = -1
+        if per_comuna < 0:
+            return {'response': 'Debe ingresar un número válido de eventos por comuna.'}
+
+        if comunas:
+            if region and region not in reference.region_ids:
+                return {'response': 'Debe ingresar un nombre de región válido.'}
+            comuna_ids = []
+            for comuna in dict.fromkeys(comunas):
+                regions = [region] if region else sorted(reference.comuna_regions.get(comuna, ()))
+                if (regions[0] if regions else None, comuna) not in reference.region_comuna_ids:
+                    return {'response': 'Debe ingresar nombres de comuna válidos.', 'comuna': comuna}
+                comuna_ids += [reference.region_comuna_ids[(comuna_region, comuna)] for comuna_region in regions]
+
+            size = qr.id_list_size(len(comuna_ids))
+            params = comuna_ids + [comuna_ids[-1]] * (size - len(comuna_ids))
+            comunas_query, events_query = qr.comunas_by_ids(size), qr.latest_events_by_comuna_ids(size)
+        else:
+            try:
+                south, west, north, east = (float(bound) for bound in (bbox or '').split(','))
+                if not (south < north and west < east):
+                    raise ValueError
+            except ValueError:
+                return {'response': 'Debe ingresar comunas o bbox (sur,oeste,norte,este) válidos.'}
+            params = [*clamp_box(west, south, east, north)]
+            comunas_query, events_query = qr.comunas_in_box, qr.latest_events_in_box
+
+        summaries, regions = {}, {}
+        for comuna_id, lat, lng, events, images in self._static_query(comunas_query, params):
+            comuna, comuna_region = reference.comuna_locations[comuna_id]
+            summaries[comuna_id] = {
+                'comuna': comuna,
+                'region': comuna_region,
+                'lat': lat,
+                'lng': lng,
+                'count': events,
+                'images': images,
+                'events': []
+            }
+
+            region_summary = regions.setdefault(comuna_region, {'region': comuna_region, 'count': 0, 'images': 0})
+            region_summary['count'] += events
+            region_summary['images'] += images
+
+        db_events = self._static_query(events_query, [per_comuna, *params]) if summaries and per_comuna else []
+        for event in self.__get_cleaned_events(db_events):
+            comuna_id = reference.region_comuna_ids[(event.region, event.comuna)]
+            summaries[comuna_id]['events'].append(event)
+
+        return {
+            'comunas': list(summaries.values()),
+            'regions': list(regions.values()),
+            'count': sum(summary['count'] for summary in summaries.values())
+        }
+
+    def __stream_events(self, offset: int, sort_key: Optional[Tuple[Any, int]]) -> Iterator[Dict]:
+        """
+        Read events in batches of stream_batch_size, every batch after the first one from the last event
+        of previous batch on, as in keyset pagination.
+
+        Batches are read within the transaction of handler, so they share a snapshot of events.
+
+        :param offset:
+            number of rows to skip before first batch, if no sort key is given.
+        :param sort_key:
+            start datetime and id of last event already seen, if None events are read from the latest.
+
+        :return:
+            iterator over events data formatted, as get_events lists them.
+        """
+
+        while True:
+            if sort_key:
+                start_date, event_id = sort_key
+                db_events = self._static_query(qr.events_after, (start_date, start_date, event_id, stream_batch_size))
+            else:
+                db_events = self._static_query(qr.events, (stream_batch_size, offset))
+
+            yield from self.__get_cleaned_events(db_events)
+
+            if len(db_events) < stream_batch_size:
+                return
+            sort_key = db_events[-1][6], db_events[-1][0]
+
+    def __get_cleaned_events(self, db_events: List[Tuple]) -> List[EncodedEvent]:
+        """
+        Get events data in a cleaner manner, encoded as responses list them.
+
+        Events already encoded by current process for current data version are
+        reused, only the rest are completed with their images and social networks.
 
         :param db_events:
             events data retrieved directly from db.
 
         :return:
-            all data concerning events queried, as a dictionary for readability.
+            all data concerning events queried, encoded in the order they were queried.
+        """
+
+        if not db_events:
+            return []
+
+        # ids to get events info from other tables in db, queried once for every event not encoded yet
+        version = data_version()
+        encoded = _event_cache.get(self.database, list(dict.fromkeys(event[0] for event in db_events)), version)
+        missing = list({event[0]: event for event in db_events if event[0] not in encoded}.values())
+        event_ids = [event[0] for event in missing]
+
+        if event_ids:
+            new_events = [EncodedEvent(event) for event in self.__clean_events(missing, event_ids)]
+            _event_cache.put(self.database, new_events, version)
+            encoded.update((event.event_id, event) for event in new_events)
+
+        return [encoded[event[0]] for event in db_events]
+
+    def __clean_events(self, db_events: List[Tuple], event_ids: List[int]) -> List[Dict]:
+        """
+        Complete events with their location, images and social networks.
+
+        :param db_events:
+            events data retrieved directly from db, one row per event.
+        :param event_ids:
+            ids of events, in same order.
+
+        :return:
+            data of every event, as a dictionary for readability.
         """
 
+        # comuna and region names by comuna id
+        locations = self.reference_data.comuna_locations
+
+        # order images and social networks as objects for easy component reading, grouped by event id
+        networks_by_event = {event_id: [] for event_id in event_ids}
+        for event_id, social_network, url in self._event_ids_query(qr.social_networks_by_event_ids, event_ids):
+            networks_by_event[event_id].append({'social-network': social_network, 'url': url})
+
+        # downscaled variants by original image, shared by every foto row of same content
+        variants_by_image = {}
+        for basepath, image_path, width, image_format, variant_basepath, variant_path in \
+                self._event_ids_query(qr.variants_by_event_ids, event_ids):
+            variants_by_image.setdefault((basepath, image_path), []).append({
+                'width': width,
+                'format': image_format,
+                'basepath': variant_basepath,
+                'image-path': variant_path
+            })
+
+        images_by_event = {event_id: [] for event_id in event_ids}
+        for event_id, basepath, image_path in self._event_ids_query(qr.images_by_event_ids, event_ids):
+            images_by_event[event_id].append({
+                'basepath': basepath,
+                'image-path': image_path,
+                'variants': variants_by_image.get((basepath, image_path), [])
+            })
+
+        # start and end dates of every event, formatted at once
+        dates = format_datetimes([date for event in db_events for date in (event[6], event[7])])
+
         cleaned_events = []
-        for event in db_events:
-            event_id, comuna_id = event[:2]  # ids to get event info from other tables in db
-
-            comuna, region_id = self._static_query(qr.comuna_by_id(comuna_id=comuna_id))[0]  # comuna name, region id
-            region = self._static_query(qr.region_by_id(region_id=region_id))[0][0]  # region name
-            social_networks = self._static_query(qr.social_networks_by_event_id(event_id=event_id))  # social networks
-            images = self._static_query(qr.images_by_event_id(event_id=event_id))  # images
-
-            # order images and social networks as objects for easy component reading
-            temp_networks = [
-                {'social-network': social_network[0], 'url': social_network[1]} for social_network in social_networks
-            ]
-            temp_images = [
-                {'basepath': image[0], 'image-path': image[1]} for image in images
-            ]
+        for index, event in enumerate(db_events):
+            event_id, comuna_id = event[:2]
+            comuna, region = locations[comuna_id]
 
             # order and append data cleaned_events list
             cleaned_events.append({
@@ -196,12 +955,12 @@ class EventDatabase:
                 'nombre': event[3],
                 'email': event[4],
                 'celular': event[5],
-                'dia-hora-inicio': event[6].strftime(datetimeformat),
-                'dia-hora-termino': event[7].strftime(datetimeformat),
+                'dia-hora-inicio': dates[2 * index],
+                'dia-hora-termino': dates[2 * index + 1],
                 'descripcion-evento': event[8],
                 'tipo-comida': event[9],
-                'red-social': temp_networks,
-                'foto-comida': temp_images
+                'red-social': networks_by_event[event_id],
+                'foto-comida': images_by_event[event_id]
             })
 
         return cleaned_events
@@ -210,45 +969,66 @@ class EventDatabase:
     def event_count(self) -> int:
         """
         :return:
-            property returning total number of events in db.
+            property returning total number of events in db, cached for a few seconds.
         """
 
-        return self._static_query(qr.count_rows('evento'))[0][0]
+        return _count_cache.get(self.database, lambda: self._static_query(qr.count_events)[0][0])
 
-    def get_social_networks(self) -> List[str]:
+    @property
+    def reference_data(self) -> ReferenceData:
         """
         :return:
-            social networks options accepted by database.
+            property returning regions, comunas, food types and social networks, cached for process.
         """
 
-        # get social network enum from database
-        social_networks = self._static_query(qr.column_type(self.database, 'red_social', 'nombre'))
+        return _reference_cache.get(self.database, self.__query_reference_data)
 
-        # database requires cleaning before returning
-        clean_response = social_networks[0][0]
-        clean_response = clean_response.replace('enum(', '[')
-        clean_response = clean_response.replace(')', ']')
+    def __query_reference_data(self) -> ReferenceData:
+        """
+        :return:
+            reference data queried directly from database.
+        """
 
-        # clean response is a string, eval transforms it into a list
-        return eval(clean_response)
+        return ReferenceData(
+            regions=self._static_query(qr.regions),  # full row response -> [id, name]
+            comunas=self._static_query(qr.comunas),  # full row response -> [id, name, region-id]
+            food_types=self.__query_enum('evento', 'tipo'),
+            social_networks=self.__query_enum('red_social', 'nombre')
+        )
 
-    def get_food_types(self) -> List[str]:
+    def __query_enum(self, table: str, column: str) -> List[str]:
         """
         :return:
-            food type options accepted by database.
+            options of an enum column accepted by database.
         """
 
-        # get food type enum from database
-        food_types = self._static_query(qr.column_type(self.database, 'evento', 'tipo'))
+        # get enum from database
+        column_type = self._static_query(qr.column_type, (self.database, table, column))
 
         # database requires cleaning before returning
-        clean_response = food_types[0][0]
+        clean_response = column_type[0][0]
         clean_response = clean_response.replace('enum(', '[')
         clean_response = clean_response.replace(')', ']')
 
         # clean response is a string, eval transforms it into a list
         return eval(clean_response)
 
+    def get_social_networks(self) -> List[str]:
+        """
+        :return:
+            social networks options accepted by database.
+        """
+
+        return list(self.reference_data.social_networks)
+
+    def get_food_types(self) -> List[str]:
+        """
+        :return:
+            food type options accepted by database.
+        """
+
+        return list(self.reference_data.food_types)
+
     def get_regions(self, name_only: bool) -> List[Union[Tuple, str]]:
         """
         :return:
@@ -256,9 +1036,9 @@ class EventDatabase:
         """
 
         # database registered regions (full row response -> [id, name])
-        regions = self._static_query("SELECT * FROM region")
+        regions = self.reference_data.regions
         if not name_only:
-            return regions  # return full row response
+            return list(regions)  # return full row response
 
         return [region_name for _, region_name in regions]  # return names of regions only
 
@@ -269,7 +1049,7 @@ class EventDatabase:
         """
 
         # database registered comunas (full row response -> [id, name, region-id])
-        temp_comunas = self._static_query("SELECT * FROM comuna")
+        temp_comunas = self.reference_data.comunas
 
         comunas = [[] for _ in range(num_regions)]  # group comunas by region
         for comuna in temp_comunas:
@@ -281,23 +1061,34 @@ class EventDatabase:
 
         return comunas
 
-    def get_events_ids(self):
+    def get_image_count_per_comuna(self):
         """
         :return:
-            ids from events registered in db.
+            image count from events per comuna.
         """
 
-        ids = self._static_query(qr.events_ids)
-        return ids
+        comunas_and_images = self._static_query(qr.comunas_and_images)
+        return comunas_and_images
 
-    def get_image_count_per_comuna(self):
+    def get_referenced_images(self, directory: str) -> Set[str]:
         """
         :return:
-            image count from events per comuna.
+            names of images in a directory that are referenced by at least one foto row.
         """
 
-        comunas_and_images = self._static_query(qr.comunas_and_images)
-        return comunas_and_images
+        return {name for name, in self._static_query(qr.images_by_directory, (directory,))}
+
+    def delete_variants(self, directory: str, name: str) -> None:
+        """
+        Forget variants generated for an image, once its files are collected.
+
+        :param directory:
+            directory of image.
+        :param name:
+            name of image.
+        """
+
+        self._dynamic_query(qr.delete_variants, (directory, name))
 
     def get_event_count_by_start_date(self):
         """
@@ -323,36 +1114,14 @@ class EventDatabase:
             number if events per month, and separated by daytime of occurrence (early, midday, evening)
         """
 
-        # query events by daytime and month
-        early_events = self._static_query(qr.events_by_month_between_timeframe('00:01', '10:59'))
-        midday_events = self._static_query(qr.events_by_month_between_timeframe('11:00', '14:59'))
-        evening_events = self._static_query(qr.events_by_month_between_timeframe('15:00', '23:59'))
-
-        # get months from query responses
-        early_months = [month for month, _ in early_events]
-        midday_months = [month for month, _ in midday_events]
-        evening_months = [month for month, _ in evening_events]
-
-        # obtain list of months with no duplicates and sorted
-        months_duplicated = early_months + midday_months + evening_months
-        months = deepcopy(list(set(months_duplicated)))
-        months.sort(key=lambda date: datetime.strptime(date, '%Y-%m'))
-
-        early = []
-        midday = []
-        evening = []
+        # events per month and daytime, kept up to date by register_event:
+        # early 00:01-10:59, midday 11:00-14:59 and evening 15:00-23:59, events at 00:00 are left out
+        months_and_count = self._static_query(qr.events_by_month_and_daytime)
 
-        for i, month in enumerate(months):  # cycle to fill months daytimes with 0 events
-            if month not in early_months:
-                early_events.insert(i, (month, 0))
-            if month not in midday_months:
-                midday_events.insert(i, (month, 0))
-            if month not in evening_months:
-                evening_events.insert(i, (month, 0))
-
-            early.append(early_events[i][1])
-            midday.append(midday_events[i][1])
-            evening.append(evening_events[i][1])
+        months = [month for month, _, _, _ in months_and_count]
+        early = [early_count for _, early_count, _, _ in months_and_count]
+        midday = [midday_count for _, _, midday_count, _ in months_and_count]
+        evening = [evening_count for _, _, _, evening_count in months_and_count]
 
         return {  # every list of response should have same length
             'months': months,
@@ -365,6 +1134,11 @@ class EventDatabase:
         """
         Register an event by saving data received as a POST request.
 
+        Images are written to disk first, then event, images, social networks
+        and statistics are inserted in a single transaction, statistics last
+        since their rows are shared by concurrent registrations. If anything
+        fails no row is saved.
+
         :param postdata:
             data submitted by front-end as a POST request.
 
@@ -372,88 +1146,220 @@ class EventDatabase:
             whether db handler correctly saved POST data.
         """
 
-        comuna = postdata.getfirst('comuna', default='')
-        sector = postdata.getfirst('sector', default='')
-
-        name = postdata.getfirst('nombre', default='')
-        email = postdata.getfirst('email', default='')
-        phone = postdata.getfirst('celular', default='')
-
-        description = postdata.getfirst('descripcion-evento', default='')
-        food_type = postdata.getfirst('tipo-comida', default='')
-        open_date = postdata.getfirst('dia-hora-inicio', default='')
-        close_date = postdata.getfirst('dia-hora-termino', default='')
+        region, comuna, sector, name, email, phone, description, food_type, open_date, close_date = \
+            event_fields(postdata)
 
-        # save in event table first
-        comuna_id = self._static_query(qr.comuna_id_by_name(comuna))[0][0]
-        event_id = self._dynamic_query(qr.insert_event, (
-            comuna_id, sector, name, email, phone, open_date, close_date, description, food_type
-        ))
+        reference = self.reference_data
+        comuna_id = reference.region_comuna_ids[(region, comuna)]
 
-        # save images and check for errors
         images: Union[List[FieldStorage], FieldStorage] = postdata['foto-comida']
         if not isinstance(images, list):
             images: List[FieldStorage] = [images]
 
-        images_num = len(images)
-        ok_saved = 0
-        filepath = 'media'
+        # save images before transaction, so that no lock is held while writing files
+        stored = []
         for image in images:
-            filename = image.filename
+            stored_image = store_image(image)
+            if not stored_image:
+                return False
+            stored.append(stored_image)
+
+        social_networks = [
+            (resolve_hostname(urlparse(social_network).hostname, reference.social_networks), social_network)
+            for social_network in postdata.getlist('red-social')
+        ]
+
+        try:
+            event_id = self._dynamic_query(qr.insert_event, (
+                comuna_id, sector, name, email, phone, open_date, close_date, description, food_type
+            ), commit=False)
+            self._batch_query(qr.insert_image, [
+                (directory, name, event_id) for directory, name in stored
+            ])
+            self._batch_query(qr.enqueue_variants, [  # variants are generated by tools/variant_worker.py
+                (*image, *image) for image in stored
+            ])
+            if social_networks:
+                self._batch_query(qr.insert_social_network, [
+                    (network_name, social_network, event_id) for network_name, social_network in social_networks
+                ])
+            self._update_statistics(open_date, food_type, comuna_id, len(stored), commit=True)
+        except BaseException:
+            self.cnx.rollback()  # stored images left without reference are collected later
+            raise
+
+        _count_cache.update(self.database, lambda count: count + 1)  # keep cached count in line until it expires
+        bump_data_version()  # responses cached by clients are stale now
+        return True
+
+    def register_events(self, events: List[FieldStorage]) -> List[int]:
+        """
+        Register several already validated events in a single transaction.
+
+        Images of every event are written to disk first. Then events are inserted
+        one by one, taking their ids from AUTO_INCREMENT as concurrent
+        registrations do, while rows of every other table are inserted in batches
+        with executemany and statistics are added once per batch. If anything
+        fails no row is saved.
+
+        :param events:
+            data of every event, as cgi FieldStorage or objects with same interface.
+
+        :return:
+            ids of registered events, in same order.
+        """
+
+        if not events:
+            return []
+
+        reference = self.reference_data
+
+        # save images before transaction, so that no lock is held while writing files
+        stored_by_event = []
+        for postdata in events:
+            images = postdata['foto-comida']
+            if not isinstance(images, list):
+                images = [images]
+
+            stored = []
+            for image in images:
+                stored_image = store_image(image)
+                if not stored_image:
+                    raise OSError(f'Image {image.filename} could not be saved.')
+                image.file.close()  # source isn't needed anymore, don't hold a descriptor per image
+                stored.append(stored_image)
+            stored_by_event.append(stored)
+
+        try:
+            event_ids, image_rows, network_rows = [], [], []
+            days, food_types, months, comuna_images, comuna_events = {}, {}, {}, {}, {}
+
+            for postdata, stored in zip(events, stored_by_event):
+                region, comuna, sector, name, email, phone, description, food_type, open_date, close_date = \
+                    event_fields(postdata)
+
+                comuna_id = reference.region_comuna_ids[(region, comuna)]
+                event_id = self._dynamic_query(qr.insert_event, (
+                    comuna_id, sector, name, email, phone, open_date, close_date, description, food_type
+                ), commit=False)
+                event_ids.append(event_id)
+                image_rows += [(*stored_image, event_id) for stored_image in stored]
+
+                for social_network in postdata.getlist('red-social'):
+                    hostname = urlparse(social_network).hostname
+                    social_network_name = resolve_hostname(hostname, reference.social_networks)
+                    network_rows.append((social_network_name, social_network, event_id))
+
+                # statistics are added up for whole batch
+                day = open_date[:10]
+                days[day] = days.get(day, 0) + 1
+                food_types[food_type] = food_types.get(food_type, 0) + 1
+                month = months.setdefault(open_date[:7], [0, 0, 0])
+                for daytime, count in enumerate(daytime_counts(open_date)):
+                    month[daytime] += count
+                comuna_images[comuna_id] = comuna_images.get(comuna_id, 0) + len(stored)
+                comuna_events[comuna_id] = comuna_events.get(comuna_id, 0) + 1
+
+            if image_rows:
+                self._batch_query(qr.insert_image, image_rows)
+                self._batch_query(qr.enqueue_variants, [
+                    (*image, *image) for image in dict.fromkeys(row[:2] for row in image_rows)
+                ])
+            if network_rows:
+                self._batch_query(qr.insert_social_network, network_rows)
+
+            self._batch_query(qr.update_day_statistics, [
+                (day, total, total) for day, total in days.items()
+            ])
+            self._batch_query(qr.update_food_type_statistics, [
+                (food_type, total, total) for food_type, total in food_types.items()
+            ])
+            self._batch_query(qr.update_month_daytime_statistics, [
+                (month, *counts, *counts) for month, counts in months.items()
+            ])
+            self._batch_query(qr.update_comuna_images_statistics, [
+                (comuna_id, total, total) for comuna_id, total in comuna_images.items()
+            ])
+            self._batch_query(qr.update_comuna_events_statistics, [
+                (comuna_id, total, total) for comuna_id, total in comuna_events.items()
+            ], commit=True)
+        except BaseException:
+            self.cnx.rollback()  # stored images left without reference are collected later
+            raise
+
+        _count_cache.update(self.database, lambda count: count + len(event_ids))
+        bump_data_version()
+        return event_ids
+
+    def claim_variant_jobs(self, limit: int) -> List[Tuple[str, str]]:
+        """
+        Take pending variant jobs, locked until save_variants ends the transaction.
 
-            file_count = self._static_query("SELECT MAX(id) FROM foto")[0][0] + 1
-            file_hash = hashlib.sha256(filename.encode()).hexdigest()[:30]
-            hash_name = str(file_count) + file_hash
+        Jobs locked by another worker are skipped, so several workers can run at once.
 
-            image_path = Path(filepath) / hash_name
-            correct = safe_save(image, image_path)
-            ok_saved += int(correct)
+        :param limit:
+            maximum number of jobs taken.
 
-            self._dynamic_query(qr.insert_image, (
-                filepath, hash_name, event_id
-            ))
+        :return:
+            directory and name of images waiting for variants, oldest first.
+        """
 
-        event_saved_ok = images_num == ok_saved
-        if not event_saved_ok:
-            self._dynamic_query(f"""DELETE FROM evento WHERE id={event_id}""", (None,))
-            return False
+        self.cursor.execute(qr.claim_variant_jobs, (limit,))
+        return self.cursor.fetchall()
 
-        social_networks = postdata.getlist('red-social')
-        for social_network in social_networks:
-            hostname = urlparse(social_network).hostname
-            social_network_name = resolve_hostname(hostname, self.get_social_networks())
+    def save_variants(self, results: Dict[Tuple[str, str], List[Tuple[int, str, str, str]]]) -> None:
+        """
+        Record variants generated for claimed images and remove their jobs, releasing every claimed job.
 
-            self._dynamic_query(qr.insert_social_network, (
-                social_network_name, social_network, event_id
-            ))
+        :param results:
+            width, format, directory and name of every variant, by directory and name of original image.
+        """
 
-        return event_saved_ok
+        try:
+            variant_rows = [(*image, *variant) for image, variants in results.items() for variant in variants]
+            if variant_rows:
+                self.cursor.executemany(qr.insert_variant, variant_rows)
+            if results:
+                self.cursor.executemany(qr.delete_variant_job, list(results))
+            self.cnx.commit()
+        except BaseException:
+            self.cnx.rollback()
+            raise
 
 
-def safe_save(file: FieldStorage, save_path: Path) -> bool:
+def event_fields(postdata: FieldStorage) -> Tuple[str, ...]:
     """
-    Save a file checking equal size of origin and saved file.
+    Read event fields submitted, in the order register methods expect them.
 
-    :param file:
-        file to be saved.
-    :param save_path:
-        path to save file.
+    :param postdata:
+        event data, as a cgi FieldStorage or an object with same getfirst method.
 
     :return:
-         whether saved file has same size as origin file.
+        tuple - region, comuna, sector, name, email, phone, description, food type, start and end dates.
+    """
+
+    return tuple(postdata.getfirst(field, default='') for field in (
+        'region', 'comuna', 'sector', 'nombre', 'email', 'celular',
+        'descripcion-evento', 'tipo-comida', 'dia-hora-inicio', 'dia-hora-termino'
+    ))
+
+
+def daytime_counts(open_date: str) -> Tuple[int, int, int]:
     """
+    Classify start of an event by daytime, same bounds as statistics tables rebuild.
 
-    size = os.fstat(file.file.fileno()).st_size  # submitted file size
-    correct = False
-    while not correct:
-        file.file.seek(0, 0)  # return pointer to beginning of file
-        with open(save_path, 'wb') as f:
-            f.write(file.file.read())
+    :param open_date:
+        start datetime of event, with datetimeformat.
 
-        with open(save_path, 'rb') as f:
-            saved_fd = f.fileno()
-            saved_file_size = os.fstat(saved_fd).st_size  # saved file size
+    :return:
+        tuple - 1 on daytime of event (early, midday or evening) and 0 on the others.
+    """
 
-        correct = saved_file_size == size  # check file saved has same size
+    hours, minutes = open_date[11:16].split(':')
+    minute_of_day = int(hours) * 60 + int(minutes)
 
-    return correct
+    return (
+        int(1 <= minute_of_day <= 659),  # early 00:01-10:59
+        int(660 <= minute_of_day <= 899),  # midday 11:00-14:59
+        int(900 <= minute_of_day <= 1439)  # evening 15:00-23:59
+    )
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+httpcache.py:
+    validators and in-memory storage for responses of read-only data requests.
+
+    A response depends only on its request params and the data version, so its
+    ETag is derived from both without querying database. Clients sending back a
+    matching ETag are answered with 304 Not Modified.
+"""
+
+import hashlib
+import threading
+from cgi import FieldStorage
+from collections import OrderedDict
+from typing import Optional
+
+from conf import response_cache_size
+from metrics import cache_lookup
+
+# request types whose response can be cached, every one of them reads data only
+cacheable_types = ['regions-comunas',
+                   'food-types',
+                   'social-networks',
+                   'comunas-images',
+                   'events-per-day',
+                   'events-per-type',
+                   'events-month-daytime']
+
+
+def cache_key(params: FieldStorage) -> Optional[str]:
+    """
+    Normalize request params, so equivalent requests share a cache entry.
+
+    :param params:
+        URL params in a cgi FieldStorage.
+
+    :return:
+        params sorted as a query string, None if request can't be cached.
+    """
+
+    if params.getfirst('type', None) not in cacheable_types:
+        return None
+
+    return '&'.join(f'{key}={value}' for key in sorted(params.keys()) for value in params.getlist(key))
+
+
+def etag(key: str, version: str) -> str:
+    """
+    :return:
+        strong validator of response for given params and data version.
+    """
+
+    digest = hashlib.sha1(f'{version}?{key}'.encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(if_none_match: Optional[str], tag: str) -> bool:
+    """
+    Check whether client already holds current response.
+
+    :param if_none_match:
+        value of If-None-Match header sent by client.
+    :param tag:
+        ETag of current response.
+
+    :return:
+        bool - whether a 304 Not Modified can be answered.
+    """
+
+    if not if_none_match:
+        return False
+
+    client_tags = [client_tag.strip() for client_tag in if_none_match.split(',')]
+    return '*' in client_tags or any(client_tag.replace('W/', '', 1) == tag for client_tag in client_tags)
+
+
+class ResponseCache:
+    """
+    Encoded responses of a long-lived worker for current data version.
+
+    Entries are evicted least recently used first, and the whole cache
+    is emptied once data version changes.
+    """
+
+    def __init__(self, size: int):
+        """
+        Constructor of ResponseCache.
+
+        :param size:
+            maximum number of responses kept.
+        """
+
+        self._size = size
+        self._version = None
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> Optional[bytes]:
+        """
+        :return:
+            encoded response for params and data version, None if not cached.
+        """
+
+        with self._lock:
+            hit = version == self._version and key in self._entries
+            cache_lookup('response', hit)
+            if not hit:
+                return None
+
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, version: str, body: bytes) -> None:
+        """
+        Keep encoded response for params and data version.
+        """
+
+        with self._lock:
+            if version != self._version:  # stale responses are dropped all at once
+                self._entries.clear()
+                self._version = version
+
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+
+# responses cached by current process
+response_cache = ResponseCache(size=response_cache_size)
@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+media.py:
+    content addressed storage for uploaded images.
+
+    An image is stored once under the SHA-256 of its bytes, in directories sharded
+    by the first characters of the hash (media/ab/cd/abcd...), so identical uploads
+    share a single file and a stored file never changes. Every foto row pointing to
+    a file is a reference to it, files with no reference left are removed by
+    tools/collect_media.py.
+
+    Downscaled variants of an image are stored next to it, named after its hash
+    with width and format (abcd...-480.webp), they're generated by
+    tools/variant_worker.py and collected along with their image.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from cgi import FieldStorage
+from pathlib import Path, PurePosixPath
+from typing import Iterator, List, Optional, Set, Tuple, Callable
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # variants can't be generated, originals are served instead
+    Image = ImageOps = None
+
+from conf import root_path, media_path, media_root, save_chunk_size, save_attempts, variant_widths, variant_formats, \
+    variant_quality
+
+# Pillow format name by variant format
+pillow_formats = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+# suffix of files being written, left behind if their process is killed
+temp_suffix = '.tmp'
+
+
+def disk_directory(directory: str) -> Path:
+    """
+    :param directory:
+        directory of images as foto rows keep it, relative to repository root.
+
+    :return:
+        path of directory on disk.
+    """
+
+    relative = PurePosixPath(directory)
+    if relative.parts[:1] == (media_path,):
+        return Path(media_root, *relative.parts[1:])
+    return root_path / relative
+
+
+def store_image(file: FieldStorage) -> Optional[Tuple[str, str]]:
+    """
+    Save an uploaded image by content, hashing it while it's copied.
+
+    File is copied in fixed size chunks into a temporary file in media root,
+    synced to disk and then renamed into its shard once its hash is known, so
+    memory used doesn't depend on file size and a partially written file is never
+    visible. If an image with same content is already stored, the copy is discarded.
+
+    :param file:
+        file to be saved.
+
+    :return:
+        tuple - directory and name of stored image, as foto rows keep them. None if
+        image couldn't be saved.
+    """
+
+    source = file.file
+    source.seek(0, os.SEEK_END)
+    size = source.tell()  # submitted file size
+
+    for _ in range(save_attempts):
+        source.seek(0, 0)  # return pointer to beginning of file
+        file_hash = hashlib.sha256()
+        temp_path = None
+        try:
+            os.makedirs(media_root, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(suffix=temp_suffix, prefix='.', dir=media_root)
+            temp_path = Path(temp_name)
+            with open(fd, 'wb') as f:
+                while True:
+                    chunk = source.read(save_chunk_size)
+                    if not chunk:
+                        break
+                    file_hash.update(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+                saved_file_size = f.tell()  # saved file size
+
+            if saved_file_size != size:  # check file saved has same size
+                temp_path.unlink()
+                continue
+
+            digest = file_hash.hexdigest()
+            directory = f'{media_path}/{digest[:2]}/{digest[2:4]}'
+            image_directory = disk_directory(directory)
+            image_directory.mkdir(parents=True, exist_ok=True)
+
+            image_path = image_directory / digest
+            try:  # same content already stored, refreshed so it isn't collected meanwhile
+                os.utime(image_path)
+                temp_path.unlink()
+            except FileNotFoundError:
+                os.replace(temp_path, image_path)
+
+            return directory, digest
+        except OSError:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+    return None
+
+
+def create_variants(directory: str, name: str) -> List[Tuple[int, str, str, str]]:
+    """
+    Generate downscaled variants of a stored image, for every configured width smaller than it.
+
+    Every variant is written to a temporary file and renamed, like stored images.
+
+    :param directory:
+        directory of stored image.
+    :param name:
+        name of stored image.
+
+    :return:
+        list - width, format, directory and name of every variant generated. Empty if
+        image can't be read or Pillow isn't installed.
+    """
+
+    if Image is None:
+        return []
+
+    variants = []
+    try:
+        with Image.open(disk_directory(directory) / name) as original:
+            original = ImageOps.exif_transpose(original)  # phones store rotation apart from pixels
+            for width in sorted(variant_widths):
+                if width >= original.width:
+                    break
+                height = max(1, round(original.height * width / original.width))
+                resized = original.resize((width, height), Image.LANCZOS)
+
+                for image_format in variant_formats:
+                    variant = resized.convert('RGB') if image_format == 'jpeg' else resized
+                    variant_name = f'{name}-{width}.{image_format}'
+                    fd, temp_name = tempfile.mkstemp(suffix=temp_suffix, prefix=f'.{variant_name}.',
+                                                     dir=disk_directory(directory))
+                    with open(fd, 'wb') as f:
+                        variant.save(f, pillow_formats[image_format], quality=variant_quality)
+                    os.replace(temp_name, disk_directory(directory) / variant_name)
+                    variants.append((width, image_format, directory, variant_name))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return variants  # whatever was generated is still usable
+
+    return variants
+
+
+def modified_before(path: Path, limit: float) -> bool:
+    """
+    :return:
+        whether file exists and was last modified before limit, a timestamp.
+    """
+
+    try:
+        return path.stat().st_mtime < limit
+    except FileNotFoundError:
+        return False
+
+
+def stored_images(older_than: float) -> Iterator[Tuple[str, str]]:
+    """
+    Walk content addressed images, skipping recent ones that may belong to a registration in progress.
+
+    :param older_than:
+        seconds since last modification for an image to be considered.
+
+    :return:
+        iterator over directory, as foto rows keep it, and name of stored images.
+    """
+
+    limit = time.time() - older_than
+    for image_path in Path(media_root).glob('[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]/*'):
+        if not image_path.name.startswith('.') and image_path.is_file() and modified_before(image_path, limit):
+            yield f'{media_path}/{image_path.parent.parent.name}/{image_path.parent.name}', image_path.name
+
+
+def collect_images(older_than: float,
+                   referenced: Callable[[str], Set[str]],
+                   delete_variants: Callable[[str, str], None]) -> int:
+    """
+    Remove stored images that no foto row references, with their variants.
+
+    Variants of an image are forgotten before their files are removed, so an upload of same content
+    afterwards has its variants generated again instead of pointing to removed files.
+
+    :param older_than:
+        seconds since last modification for an image to be removed.
+    :param referenced:
+        function returning names of images referenced in a directory.
+    :param delete_variants:
+        function forgetting variants of an image, given its directory and name.
+
+    :return:
+        number of images removed.
+    """
+
+    removed = 0
+    references = {}
+    forgotten = set()
+    for directory, name in stored_images(older_than):
+        if directory not in references:
+            references[directory] = referenced(directory)
+
+        image_name = name.split('-', 1)[0]  # variants are named after their image
+        if image_name in references[directory]:
+            continue
+
+        # an upload of same content may have refreshed image and referenced it since directory was read
+        references[directory] = referenced(directory)
+        image_path = disk_directory(directory) / name
+        if image_name in references[directory] or not modified_before(image_path, time.time() - older_than):
+            continue
+
+        if (directory, image_name) not in forgotten:
+            delete_variants(directory, image_name)
+            forgotten.add((directory, image_name))
+
+        image_path.unlink(missing_ok=True)
+        removed += 1
+
+    return removed
+
+
+def collect_temp_files(older_than: float) -> int:
+    """
+    Remove temporary files left by processes killed while writing an image or a variant.
+
+    :param older_than:
+        seconds since last modification for a temporary file to be removed.
+
+    :return:
+        number of temporary files removed.
+    """
+
+    removed = 0
+    limit = time.time() - older_than
+    for pattern in (f'.*{temp_suffix}', f'[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]/.*{temp_suffix}'):
+        for temp_path in Path(media_root).glob(pattern):
+            if modified_before(temp_path, limit):
+                temp_path.unlink(missing_ok=True)
+                removed += 1
+
+    return removed
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+metrics.py:
+    counters and histograms of requests, database and caches, exposed in Prometheus text format.
+
+    Every process adds to its own values in memory, and merges them into a file
+    shared by every process, under a file lock, once a while and when it exits.
+    CGI scripts and WSGI workers thus add to the same totals, and any of them
+    can expose the totals of all of them.
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+from conf import metrics_path, metrics_flush_interval
+
+# content type of exposition, Prometheus text format
+content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+# upper bounds of histogram buckets, in seconds for durations
+duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+wait_buckets = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+count_buckets = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _value(value: float) -> str:
+    """
+    :return:
+        sample value in exposition format, exact, so totals keep changing as they grow.
+    """
+
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    :return:
+        labels of a sample in exposition format, values escaped.
+    """
+
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+class Registry:
+    """
+    Metrics of current process, with values added since they were last merged into shared file.
+    """
+
+    def __init__(self, path: str, flush_interval: float):
+        """
+        Constructor of Registry.
+
+        :param path:
+            file holding totals of every process.
+        :param flush_interval:
+            seconds between merges of a long-lived process.
+        """
+
+        self._path = Path(path)
+        self._flush_interval = flush_interval
+        self._metrics: Dict[str, 'Metric'] = {}
+        self._pending: Dict[str, Dict[str, float]] = {}  # metric name -> sample -> value added
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def register(self, metric: 'Metric') -> None:
+        self._metrics[metric.name] = metric
+
+    def add(self, name: str, sample: str, value: float) -> None:
+        with self._lock:
+            samples = self._pending.setdefault(name, {})
+            samples[sample] = samples.get(sample, 0) + value
+
+    def flush(self) -> None:
+        """
+        Merge values added by current process into shared file.
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path.with_name(f'{self._path.name}.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # released when lock file is closed
+            totals = self._read()
+            for name, samples in pending.items():
+                family = totals.setdefault(name, {})
+                for sample, value in samples.items():
+                    family[sample] = family.get(sample, 0) + value
+
+            temp_path = self._path.with_name(f'{self._path.name}.{os.getpid()}.tmp')
+            temp_path.write_text(json.dumps(totals))
+            os.replace(temp_path, self._path)  # readers without lock see either old or new totals
+
+    def flush_if_due(self) -> None:
+        """
+        Merge values added by current process if flush interval elapsed since last merge.
+        """
+
+        if time.monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+
+    def _read(self) -> Dict[str, Dict[str, float]]:
+        try:
+            return json.loads(self._path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def exposition(self) -> bytes:
+        """
+        :return:
+            totals of every process in Prometheus text format.
+        """
+
+        self.flush()
+        totals = self._read()
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for sample, value in totals.get(name, {}).items():
+                lines.append(f'{sample} {_value(value)}')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class Metric:
+    """
+    Family of samples sharing a name, one per set of label values.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, registry: Registry, name: str, help: str, labels: Sequence[str] = ()):
+        """
+        Constructor of Metric.
+
+        :param registry:
+            registry metric is exposed by.
+        :param name:
+            name of metric.
+        :param help:
+            description of metric.
+        :param labels:
+            names of labels every sample is identified by.
+        """
+
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._registry = registry
+        registry.register(self)
+
+
+class Counter(Metric):
+    """
+    Total that only increases.
+    """
+
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._registry.add(self.name, f'{self.name}{_labels(self.labels, labels)}', amount)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, in cumulative buckets.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, registry: Registry, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = duration_buckets):
+        """
+        Constructor of Histogram.
+
+        :param buckets:
+            upper bounds of buckets, ascending, +Inf is added.
+        """
+
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value: float, *labels: str) -> None:
+        for bound in self.buckets:  # every bucket is added, so buckets are kept in order in shared file
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            bucket_labels = _labels(self.labels + ('le',), labels + (le,))
+            self._registry.add(self.name, f'{self.name}_bucket{bucket_labels}', 1 if value <= bound else 0)
+        label_text = _labels(self.labels, labels)
+        self._registry.add(self.name, f'{self.name}_sum{label_text}', value)
+        self._registry.add(self.name, f'{self.name}_count{label_text}', 1)
+
+
+# metrics of current process, merged into shared file when it exits
+registry = Registry(path=metrics_path, flush_interval=metrics_flush_interval)
+atexit.register(registry.flush)
+
+requests = Counter(registry, 'foodevents_requests_total', 'Requests served, by route, type and status.',
+                   ('route', 'type', 'status'))
+request_seconds = Histogram(registry, 'foodevents_request_duration_seconds', 'Time to serve a request.',
+                            ('route', 'type'))
+request_round_trips = Histogram(registry, 'foodevents_request_db_round_trips', 'Database queries of a request.',
+                                ('route', 'type'), buckets=count_buckets)
+checkout_wait = Histogram(registry, 'foodevents_db_checkout_wait_seconds',
+                          'Time waited for a pooled database connection.', buckets=wait_buckets)
+checkout_timeouts = Counter(registry, 'foodevents_db_checkout_timeouts_total',
+                            'Checkouts that found no connection available in time.')
+upload_bytes = Counter(registry, 'foodevents_upload_bytes_total', 'Bytes of images accepted.')
+upload_rejects = Counter(registry, 'foodevents_upload_rejects_total', 'Images rejected, by reason.', ('reason',))
+cache_lookups = Counter(registry, 'foodevents_cache_lookups_total', 'Cache lookups, by cache and result.',
+                        ('cache', 'result'))
+
+# database queries of request being served by each thread
+_current = threading.local()
+
+
+def round_trip(count: int = 1) -> None:
+    """
+    Count queries sent to database by current request.
+    """
+
+    _current.round_trips = getattr(_current, 'round_trips', 0) + count
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    cache_lookups.inc(cache, 'hit' if hit else 'miss')
+
+
+class RequestMetrics:
+    """
+    Labels of a request being served, its status is known once response is built.
+    """
+
+    def __init__(self, route: str, request_type: str):
+        self.route = route
+        self.type = request_type
+        self.status = '200'
+
+
+@contextmanager
+def track_request(route: str, request_type: str = '') -> Iterator[RequestMetrics]:
+    """
+    Count a request, its duration and database queries, once it's served.
+
+    :param route:
+        script or path serving request.
+    :param request_type:
+        type of a data request, one of a bounded set so labels stay few.
+
+    :return:
+        context manager yielding labels of request, status can be set on them.
+    """
+
+    request = RequestMetrics(route, request_type)
+    _current.round_trips = 0
+    began = time.perf_counter()
+    try:
+        yield request
+    except BaseException:
+        request.status = '500'
+        raise
+    finally:
+        request_seconds.observe(time.perf_counter() - began, request.route, request.type)
+        request_round_trips.observe(_current.round_trips, request.route, request.type)
+        requests.inc(request.route, request.type, request.status)
+        registry.flush_if_due()
+
+
+def request_type(types: List[str], value: str) -> str:
+    """
+    :return:
+        type of a data request as a label, 'invalid' for any value outside known types.
+    """
+
+    return value if value in types else 'invalid'
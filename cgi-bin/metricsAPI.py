@@ -0,0 +1,17 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import cgitb
+import sys
+
+from metrics import content_type, registry
+
+cgitb.enable()
+
+exposition = registry.exposition()
+
+print(f'Content-type: {content_type}')
+print('')
+sys.stdout.flush()
+
+sys.stdout.buffer.write(exposition)
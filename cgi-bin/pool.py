@@ -0,0 +1,195 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+pool.py:
+    pool of MySQL connections shared by every database handler of a process.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Tuple
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+from conf import pool_size, pool_timeout, pool_ping_after
+from metrics import checkout_wait, checkout_timeouts
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections with checkout and return semantics.
+
+    Connections are opened lazily up to a maximum size, and once returned
+    they are kept idle for the next checkout instead of being closed. When
+    every connection is in use, a checkout waits for one to be returned up
+    to a timeout. A connection that has been idle for a while is pinged
+    before being handed out, and replaced if the server dropped it.
+    """
+
+    def __init__(self,
+                 size: int,
+                 timeout: float,
+                 ping_after: float,
+                 **config):
+        """
+        Constructor of ConnectionPool.
+
+        :param size:
+            maximum number of connections open at the same time.
+        :param timeout:
+            seconds to wait for a connection when all of them are in use.
+        :param ping_after:
+            seconds a connection can stay idle before checking it is still alive.
+        :param config:
+            arguments for mysql.connector.connect.
+        """
+
+        self._config = config
+        self._timeout = timeout
+        self._ping_after = ping_after
+
+        self._idle = queue.LifoQueue(maxsize=size)  # (connection, time returned), most recent first
+        self._slots = threading.BoundedSemaphore(size)  # connections that can still be checked out
+        self._closed = False
+
+    def checkout(self):
+        """
+        Take a connection from pool, opening a new one if none is idle.
+
+        :return:
+            connection with database, to be given back with checkin.
+        """
+
+        if self._closed:
+            raise PoolError('Connection pool is closed.')
+
+        began = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self._timeout)
+        checkout_wait.observe(time.perf_counter() - began)
+        if not acquired:
+            checkout_timeouts.inc()
+            raise PoolError(f'No connection available after {self._timeout} seconds.')
+
+        try:
+            try:
+                cnx, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return mysql.connector.connect(**self._config)
+
+            if time.monotonic() - returned_at > self._ping_after and not self.__is_alive(cnx):
+                self.__discard(cnx)
+                cnx = mysql.connector.connect(**self._config)
+
+            return cnx
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def checkin(self, cnx) -> None:
+        """
+        Give back a connection to pool, ending any open transaction.
+
+        :param cnx:
+            connection previously obtained with checkout.
+        """
+
+        try:
+            if self._closed:
+                self.__discard(cnx)
+                return
+
+            try:
+                cnx.rollback()  # reads share a transaction, don't keep its snapshot for next checkout
+            except mysql.connector.Error:
+                self.__discard(cnx)
+                return
+
+            self._idle.put_nowait((cnx, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Close every idle connection, connections in use are closed when returned.
+        """
+
+        self._closed = True
+        while True:
+            try:
+                cnx, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.__discard(cnx)
+
+    @staticmethod
+    def __is_alive(cnx) -> bool:
+        """
+        :return:
+            whether server still answers through connection.
+        """
+
+        try:
+            cnx.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    @staticmethod
+    def __discard(cnx) -> None:
+        """
+        Close a connection, ignoring errors of an already broken one.
+        """
+
+        try:
+            cnx.close()
+        except mysql.connector.Error:
+            pass
+
+
+# pools of current process, one per set of credentials
+_pools: Dict[Tuple[str, str, str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, user: str, password: str, database: str) -> ConnectionPool:
+    """
+    Get pool for given credentials, creating it on first use.
+
+    :param host:
+        IP address that is serving the database.
+    :param user:
+        user for accessing database.
+    :param password:
+        password associated with user to access database.
+    :param database:
+        name of schema to be accessed.
+
+    :return:
+        connection pool shared by every caller with same credentials.
+    """
+
+    key = (host, user, password, database)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size=pool_size,
+                                         timeout=pool_timeout,
+                                         ping_after=pool_ping_after,
+                                         host=host,
+                                         user=user,
+                                         password=password,
+                                         database=database)
+        return _pools[key]
+
+
+def close_pools() -> None:
+    """
+    Close every pool of current process.
+    """
+
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
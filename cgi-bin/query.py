@@ -4,9 +4,13 @@
 """
 query.py:
     script that contains queries as string that are used by database handler to get data from it.
+
+    Every query takes its values as parameters, so that database handler can keep
+    it prepared and run it again without building or parsing it.
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import Tuple
 
 insert_event = """
     INSERT INTO evento 
@@ -23,142 +27,356 @@ insert_image = """
     (ruta_archivo, nombre_archivo, evento_id)
     VALUES (%s, %s, %s)
     """
+update_day_statistics = """
+    INSERT INTO estadistica_dia
+    (fecha, total)
+    VALUES (DATE(%s), %s)
+    ON DUPLICATE KEY UPDATE total = total + %s
+    """
+update_food_type_statistics = """
+    INSERT INTO estadistica_tipo
+    (tipo, total)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE total = total + %s
+    """
+update_month_daytime_statistics = """
+    INSERT INTO estadistica_mes_horario
+    (mes, early, midday, evening)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE early = early + %s, midday = midday + %s, evening = evening + %s
+    """
+update_comuna_images_statistics = """
+    INSERT INTO estadistica_comuna_foto
+    (comuna_id, total)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE total = total + %s
+    """
+update_comuna_events_statistics = """
+    INSERT INTO estadistica_comuna_evento
+    (comuna_id, total)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE total = total + %s
+    """
+# images whose variants were already generated, e.g. uploaded again, aren't queued
+enqueue_variants = """
+    INSERT IGNORE INTO trabajo_variante
+    (ruta_archivo, nombre_archivo)
+    SELECT %s, %s
+    FROM DUAL
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM foto_variante
+        WHERE ruta_archivo = %s AND nombre_archivo = %s
+    )
+    """
+# jobs taken by a worker stay locked until its transaction ends, other workers skip them
+claim_variant_jobs = """
+    SELECT ruta_archivo, nombre_archivo
+    FROM trabajo_variante
+    ORDER BY creado
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+    """
+delete_variant_job = """
+    DELETE FROM trabajo_variante
+    WHERE ruta_archivo = %s AND nombre_archivo = %s
+    """
+insert_variant = """
+    INSERT INTO foto_variante
+    (ruta_archivo, nombre_archivo, ancho, formato, ruta_variante, nombre_variante)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE ruta_variante = VALUES(ruta_variante), nombre_variante = VALUES(nombre_variante)
+    """
+delete_variants = """
+    DELETE FROM foto_variante
+    WHERE ruta_archivo = %s AND nombre_archivo = %s
+    """
+images_by_directory = """
+    SELECT DISTINCT nombre_archivo
+    FROM foto
+    WHERE ruta_archivo = %s
+    """
 comunas_and_images = """
-    SELECT co.nombre, count(*)
-    FROM evento ev, comuna co, foto fo
-    WHERE ev.comuna_id=co.id AND fo.evento_id=ev.id
+    SELECT co.nombre, CAST(SUM(es.total) AS SIGNED)
+    FROM estadistica_comuna_foto es, comuna co
+    WHERE es.comuna_id=co.id AND es.total > 0
     GROUP BY co.nombre
     """
-events_ids = """
-    SELECT id
-    FROM evento
-    """
 events_by_start_date = """
-    SELECT DATE_FORMAT(dia_hora_inicio, '%Y-%m-%d') AS fecha, count(*) AS total
-    FROM evento
-    GROUP BY DATE_FORMAT(dia_hora_inicio, '%Y-%m-%d')
-    ORDER BY DATE_FORMAT(dia_hora_inicio, '%Y-%m-%d') ASC
+    SELECT DATE_FORMAT(fecha, '%Y-%m-%d'), total
+    FROM estadistica_dia
+    WHERE total > 0
+    ORDER BY fecha ASC
     """
 events_by_food_type = """
+    SELECT tipo, total
+    FROM estadistica_tipo
+    WHERE total > 0
+    ORDER BY tipo
+    """
+events_by_month_and_daytime = """
+    SELECT mes, early, midday, evening
+    FROM estadistica_mes_horario
+    WHERE early + midday + evening > 0
+    ORDER BY mes ASC
+    """
+
+# statements to recompute statistics tables from events, daytimes as minutes of day:
+# early 00:01-10:59, midday 11:00-14:59 and evening 15:00-23:59, events at 00:00 are left out
+rebuild_statistics = [
+    "DELETE FROM estadistica_dia",
+    """
+    INSERT INTO estadistica_dia (fecha, total)
+    SELECT DATE(dia_hora_inicio), count(*)
+    FROM evento
+    GROUP BY DATE(dia_hora_inicio)
+    """,
+    "DELETE FROM estadistica_tipo",
+    """
+    INSERT INTO estadistica_tipo (tipo, total)
     SELECT tipo, count(*)
     FROM evento
     GROUP BY tipo
+    """,
+    "DELETE FROM estadistica_mes_horario",
     """
-
-
-def events_by_month_between_timeframe(init_time: str, end_time: str) -> str:
-    query = f"""
-    SELECT DATE_FORMAT(dia_hora_inicio, '%Y-%m') AS fecha, count(*) AS total
+    INSERT INTO estadistica_mes_horario (mes, early, midday, evening)
+    SELECT DATE_FORMAT(dia_hora_inicio, '%Y-%m'),
+        COUNT(CASE WHEN HOUR(dia_hora_inicio) * 60 + MINUTE(dia_hora_inicio) BETWEEN 1 AND 659 THEN 1 END),
+        COUNT(CASE WHEN HOUR(dia_hora_inicio) * 60 + MINUTE(dia_hora_inicio) BETWEEN 660 AND 899 THEN 1 END),
+        COUNT(CASE WHEN HOUR(dia_hora_inicio) * 60 + MINUTE(dia_hora_inicio) BETWEEN 900 AND 1439 THEN 1 END)
     FROM evento
-    WHERE DATE_FORMAT(dia_hora_inicio, '%H:%i') BETWEEN '{init_time}' AND '{end_time}'
     GROUP BY DATE_FORMAT(dia_hora_inicio, '%Y-%m')
-    ORDER BY DATE_FORMAT(dia_hora_inicio, '%Y-%m') ASC
+    """,
+    "DELETE FROM estadistica_comuna_foto",
+    """
+    INSERT INTO estadistica_comuna_foto (comuna_id, total)
+    SELECT ev.comuna_id, count(*)
+    FROM evento ev, foto fo
+    WHERE fo.evento_id=ev.id
+    GROUP BY ev.comuna_id
+    """,
+    "DELETE FROM estadistica_comuna_evento",
     """
+    INSERT INTO estadistica_comuna_evento (comuna_id, total)
+    SELECT comuna_id, count(*)
+    FROM evento
+    GROUP BY comuna_id
+    """
+]
 
-    return query
 
+# LIMIT when every row is read, largest value a prepared statement binds as a signed integer
+all_rows = 2 ** 63 - 1
 
-def column_type(db: str, table: str, column: str) -> str:
-    query = f"""
-    SELECT COLUMN_TYPE 
+column_type = """
+    SELECT COLUMN_TYPE
     FROM INFORMATION_SCHEMA.COLUMNS
-    WHERE TABLE_SCHEMA = '{db}' AND TABLE_NAME = '{table}' AND COLUMN_NAME = '{column}'
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
     """
-
-    return query
-
-
-def events(limit: Optional[int] = None, offset: Optional[int] = None) -> str:
-    query = """
+regions = """
+    SELECT id, nombre
+    FROM region
+    """
+comunas = """
+    SELECT id, nombre, region_id
+    FROM comuna
+    """
+events = """
+    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+    FROM evento
+    ORDER BY dia_hora_inicio DESC, id DESC
+    LIMIT %s OFFSET %s
+    """
+# keyset pagination, rows following (dia_hora_inicio, id) of last row seen
+events_after = """
     SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
     FROM evento
-    ORDER BY dia_hora_inicio DESC
+    WHERE dia_hora_inicio < %s OR (dia_hora_inicio = %s AND id < %s)
+    ORDER BY dia_hora_inicio DESC, id DESC
+    LIMIT %s
+    """
+events_by_comuna_id = """
+    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+    FROM evento
+    WHERE comuna_id = %s
+    ORDER BY dia_hora_inicio DESC, id DESC
+    LIMIT %s
+    """
+event_by_id = """
+    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+    FROM evento
+    WHERE id = %s
+    """
+count_events = """
+    SELECT COUNT(*)
+    FROM evento
     """
 
-    if limit:
-        query += f"LIMIT {limit} "
 
-    if offset:
-        query += f"OFFSET {offset} "
+# relevance of an event for a search, served by FULLTEXT index evento_busqueda_idx
+search_match = "MATCH (nombre, descripcion, sector) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+# conditions of search filters, by filter name
+search_filters = {
+    'region': "comuna_id IN (SELECT id FROM comuna WHERE region_id = %s)",
+    'comuna': "comuna_id IN (SELECT id FROM comuna WHERE nombre = %s)",
+    'food_type': "tipo = %s",
+    'start': "dia_hora_inicio >= %s",
+    'end': "dia_hora_inicio < %s",
+}
 
-    return query
 
+@lru_cache(maxsize=None)
+def search_events(filters: Tuple[str, ...], after: bool) -> str:
+    """
+    Search of events by relevance, statement depends only on filters used so every combination is prepared once.
+
+    Parameters are search text twice, a value per filter, if after, search text, relevance, search text,
+    relevance and id of last event seen, and limit.
+    """
+
+    conditions = [search_match] + [search_filters[name] for name in filters]
+    if after:  # keyset pagination, rows following (relevance, id) of last row seen
+        conditions.append(f"({search_match} < %s OR ({search_match} = %s AND id < %s))")
 
-def events_by_comuna_id(comuna_id: int) -> str:
     query = f"""
-    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo,
+    {search_match} AS relevancia
     FROM evento
-    WHERE comuna_id={comuna_id}
-    ORDER BY dia_hora_inicio DESC
+    WHERE {' AND '.join(conditions)}
+    ORDER BY relevancia DESC, id DESC
+    LIMIT %s
     """
 
     return query
 
 
-def event_by_id(event_id: int) -> str:
+# comunas located in a box, parameters are west, south, east and north, served by comuna_ubicacion_idx
+comuna_in_box = "MBRContains(ST_MakeEnvelope(POINT(%s, %s), POINT(%s, %s)), co.ubicacion)"
+# comunas within a distance, box around circle lets spatial index discard the rest, parameters follow the box
+# ones, longitude and latitude of center and distance in meters
+comuna_near = comuna_in_box + " AND ST_Distance_Sphere(co.ubicacion, POINT(%s, %s)) <= %s"
+
+
+def comunas_in_view(condition: str) -> str:
     query = f"""
-    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
-    FROM evento
-    WHERE id={event_id}
+    SELECT co.id, ST_Y(co.ubicacion), ST_X(co.ubicacion), es.total, COALESCE(ef.total, 0)
+    FROM comuna co
+    JOIN estadistica_comuna_evento es ON es.comuna_id = co.id
+    LEFT JOIN estadistica_comuna_foto ef ON ef.comuna_id = co.id
+    WHERE {condition} AND es.total > 0
+    ORDER BY es.total DESC
     """
 
     return query
 
 
-def region_by_id(region_id: int) -> str:
+def events_in_view(condition: str) -> str:
     query = f"""
-    SELECT nombre
-    FROM region
-    WHERE region.id='{region_id}'
+    SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+    FROM evento
+    WHERE comuna_id IN (SELECT co.id FROM comuna co WHERE {condition})
+    ORDER BY dia_hora_inicio DESC, id DESC
+    LIMIT %s
     """
 
     return query
 
 
-def comuna_by_id(comuna_id: int) -> str:
+def latest_events_per_comuna(condition: str) -> str:
+    """
+    Latest events of every comuna, each comuna read from its own end of fk_evento_comuna1_idx.
+
+    Parameters are number of events per comuna, followed by the ones of condition.
+    """
+
     query = f"""
-    SELECT nombre, region_id
-    FROM comuna
-    WHERE comuna.id='{comuna_id}'
+    SELECT ev.id, ev.comuna_id, ev.sector, ev.nombre, ev.email, ev.celular, ev.dia_hora_inicio, ev.dia_hora_termino,
+    ev.descripcion, ev.tipo
+    FROM comuna co, LATERAL (
+        SELECT id, comuna_id, sector, nombre, email, celular, dia_hora_inicio, dia_hora_termino, descripcion, tipo
+        FROM evento
+        WHERE comuna_id = co.id
+        ORDER BY dia_hora_inicio DESC, id DESC
+        LIMIT %s
+    ) ev
+    WHERE {condition}
+    ORDER BY ev.comuna_id, ev.dia_hora_inicio DESC, ev.id DESC
     """
 
     return query
 
 
-def comuna_id_by_name(comuna_name: str) -> str:
-    query = f"""
-    SELECT id 
-    FROM comuna 
-    WHERE comuna.nombre='{comuna_name}'
+@lru_cache(maxsize=None)
+def comuna_in_ids(size: int) -> str:
+    placeholders = ', '.join(['%s'] * size)
+    return f"co.id IN ({placeholders})"
+
+
+# event counts by comuna and latest events, in a box or around a point
+comunas_in_box = comunas_in_view(comuna_in_box)
+comunas_near = comunas_in_view(comuna_near)
+events_in_box = events_in_view(comuna_in_box)
+events_near = events_in_view(comuna_near)
+# event counts and latest events of every comuna, in a box
+latest_events_in_box = latest_events_per_comuna(comuna_in_box)
+
+
+@lru_cache(maxsize=None)
+def comunas_by_ids(size: int) -> str:
+    return comunas_in_view(comuna_in_ids(size))
+
+
+@lru_cache(maxsize=None)
+def latest_events_by_comuna_ids(size: int) -> str:
+    return latest_events_per_comuna(comuna_in_ids(size))
+
+
+def id_list_size(count: int) -> int:
     """
+    Number of placeholders of a list of ids, rounded up to a power of two so that few statements are prepared.
 
-    return query
+    :param count:
+        number of ids, they're repeated to fill every placeholder.
+    """
+
+    return 1 << max(count - 1, 0).bit_length()
 
 
-def social_networks_by_event_id(event_id: int) -> str:
+@lru_cache(maxsize=None)
+def social_networks_by_event_ids(size: int) -> str:
+    placeholders = ', '.join(['%s'] * size)
     query = f"""
-    SELECT nombre, identificador
+    SELECT evento_id, nombre, identificador
     FROM red_social
-    WHERE evento_id='{event_id}'
+    WHERE evento_id IN ({placeholders})
+    ORDER BY evento_id, id
     """
 
     return query
 
 
-def images_by_event_id(event_id: int) -> str:
+@lru_cache(maxsize=None)
+def images_by_event_ids(size: int) -> str:
+    placeholders = ', '.join(['%s'] * size)
     query = f"""
-    SELECT ruta_archivo, nombre_archivo
+    SELECT evento_id, ruta_archivo, nombre_archivo
     FROM foto
-    WHERE evento_id={event_id}
+    WHERE evento_id IN ({placeholders})
+    ORDER BY evento_id, id
     """
 
     return query
 
 
-def count_rows(table_name: str) -> str:
+@lru_cache(maxsize=None)
+def variants_by_event_ids(size: int) -> str:
+    placeholders = ', '.join(['%s'] * size)
     query = f"""
-    SELECT COUNT(*)
-    FROM {table_name}
+    SELECT DISTINCT va.ruta_archivo, va.nombre_archivo, va.ancho, va.formato, va.ruta_variante, va.nombre_variante
+    FROM foto fo, foto_variante va
+    WHERE fo.evento_id IN ({placeholders}) AND va.ruta_archivo=fo.ruta_archivo AND va.nombre_archivo=fo.nombre_archivo
+    ORDER BY va.ancho, va.formato
     """
 
     return query
@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+querylog.py:
+    instrumentation of database queries, summarized per request.
+
+    While enabled in conf, every query a handler performs inside a request is
+    recorded with its wall time, rows returned or affected and the public
+    EventDatabase method that led to it. Once request ends, a summary is logged
+    as a JSON line, flagging statements over the slow threshold and statements
+    repeated by a method within the request, a sign of a query per item (N+1).
+
+    While disabled, query methods are left as they are, nothing is wrapped.
+"""
+
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from conf import query_log, slow_query_seconds, repeated_query_count
+
+logger = logging.getLogger('querylog')
+if query_log and not logger.handlers:
+    logger.addHandler(logging.StreamHandler(sys.stderr))  # CGI and WSGI servers keep stderr in their log
+    logger.setLevel(logging.INFO)
+
+# log of request being served by each thread
+_current = threading.local()
+
+
+class QueryRecord:
+    """
+    Query performed while serving a request.
+    """
+
+    __slots__ = ('statement', 'method', 'seconds', 'rows')
+
+    def __init__(self, statement: str, method: str, seconds: float, rows: int):
+        """
+        Constructor of QueryRecord.
+
+        :param statement:
+            query as sent, with placeholders instead of values.
+        :param method:
+            public EventDatabase method that performed query.
+        :param seconds:
+            wall time of query, including fetching its rows.
+        :param rows:
+            rows returned by a read, or affected by a write.
+        """
+
+        self.statement = statement
+        self.method = method
+        self.seconds = seconds
+        self.rows = rows
+
+
+class RequestLog:
+    """
+    Queries performed while serving a request.
+    """
+
+    def __init__(self, name: str):
+        """
+        Constructor of RequestLog.
+
+        :param name:
+            description of request, e.g. its route and type.
+        """
+
+        self.name = name
+        self.queries: List[QueryRecord] = []
+
+    def summary(self) -> Dict:
+        """
+        :return:
+            totals of request and of each method, with slow and repeated statements.
+        """
+
+        methods: Dict[str, Dict] = {}
+        repeated: Dict[tuple, int] = {}
+        for record in self.queries:
+            totals = methods.setdefault(record.method, {'queries': 0, 'seconds': 0.0, 'rows': 0})
+            totals['queries'] += 1
+            totals['seconds'] += record.seconds
+            totals['rows'] += record.rows
+            key = (record.method, record.statement)
+            repeated[key] = repeated.get(key, 0) + 1
+
+        for totals in methods.values():
+            totals['seconds'] = round(totals['seconds'], 6)
+
+        return {
+            'request': self.name,
+            'queries': len(self.queries),
+            'seconds': round(sum(record.seconds for record in self.queries), 6),
+            'rows': sum(record.rows for record in self.queries),
+            'methods': methods,
+            'slow': [{'method': record.method, 'statement': record.statement, 'seconds': round(record.seconds, 6)}
+                     for record in self.queries if record.seconds >= slow_query_seconds],
+            'repeated': [{'method': method, 'statement': statement, 'count': count}
+                         for (method, statement), count in repeated.items() if count >= repeated_query_count],
+        }
+
+
+@contextmanager
+def request_log(name: str) -> Iterator[Optional[RequestLog]]:
+    """
+    Record queries performed by current thread while serving a request, logging their summary at the end.
+
+    :param name:
+        description of request, e.g. its route and type.
+
+    :return:
+        context manager yielding log of request, None while instrumentation is disabled.
+    """
+
+    if not query_log:
+        yield None
+        return
+
+    log = _current.log = RequestLog(name)
+    try:
+        yield log
+    finally:
+        _current.log = None
+        summary = log.summary()
+        level = logging.WARNING if summary['slow'] or summary['repeated'] else logging.INFO
+        logger.log(level, json.dumps(summary, ensure_ascii=False))
+
+
+def calling_method(handler, filename: str) -> str:
+    """
+    :return:
+        name of first public method of handler in the stack, the method a query was performed for.
+    """
+
+    frame = sys._getframe(2)  # caller of instrumented query method
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename == filename and code.co_name[0] not in '_<' and frame.f_locals.get('self') is handler:
+            return code.co_name
+        frame = frame.f_back
+    return '?'
+
+
+def instrumented(query_method: Callable) -> Callable:
+    """
+    Decorate a query method of EventDatabase to record its queries in log of current request.
+
+    Method receives query string as first argument, and returns rows read or, for writes,
+    leaves rows affected in handler cursor.
+
+    :return:
+        method recording its queries, or same method while instrumentation is disabled.
+    """
+
+    if not query_log:
+        return query_method
+
+    filename = query_method.__code__.co_filename
+
+    @functools.wraps(query_method)
+    def wrapper(self, query: str, *args, **kwargs):
+        log = getattr(_current, 'log', None)
+        if log is None:  # queries outside a request, e.g. of tools, aren't recorded
+            return query_method(self, query, *args, **kwargs)
+
+        began = time.perf_counter()
+        result = query_method(self, query, *args, **kwargs)
+        seconds = time.perf_counter() - began
+
+        rows = len(result) if isinstance(result, list) else max(self.cursor.rowcount, 0)
+        log.queries.append(QueryRecord(' '.join(query.split()), calling_method(self, filename), seconds, rows))
+        return result
+
+    return wrapper
@@ -1,20 +1,28 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
-import cgi
 import cgitb
-import json
+import os
+import sys
 
 from formhandler import FormHandler
+from metrics import track_request
+from querylog import request_log
+from serializer import serializer
+from upload import MultipartForm, UploadRejected, rejected_response
 
 cgitb.enable()
 utf8stdout = open(1, 'w', encoding='utf-8', closefd=False)
 
-form = cgi.FieldStorage(keep_blank_values=True)
-form_handler = FormHandler(post_data=form)
-response = form_handler.response
+with track_request('/cgi-bin/register_event.py'):
+    try:
+        form = MultipartForm(sys.stdin.buffer, os.environ)
+        with request_log('register_event.py'):
+            response = FormHandler(post_data=form).response
+    except UploadRejected as e:
+        response = rejected_response(e)
 
 print('Content-type: application/json; charset=UTF-8')
 print('')
 
-print(json.dumps(response), file=utf8stdout)
+print(serializer.dumps(response), file=utf8stdout)
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+serializer.py:
+    JSON encoding of responses, written exactly as json.dumps writes them.
+
+    Events are encoded once, as they're read from database, and a worker keeps
+    their text so responses listing them again reuse it. A response holding
+    encoded events is dumped with a placeholder for each of them, then replaced
+    by its text, so output is the same as dumping the events themselves.
+
+    Reference payloads (regions and comunas, food types, social networks) are
+    encoded once per snapshot of reference data, and their bytes reused until
+    the snapshot is replaced.
+"""
+
+import json
+import re
+import secrets
+import threading
+from typing import Any, Dict, List
+from weakref import WeakKeyDictionary
+
+# placeholder of an encoded event in a dumped response, unguessable so no submitted text can be taken for it
+_placeholder = f'\x00{secrets.token_hex(8)}:'
+_placeholder_pattern = re.compile('"' + re.escape(json.dumps(_placeholder)[1:-1]) + r'(\d+)"')
+
+
+class EncodedEvent:
+    """
+    Event encoded as JSON, along with the fields responses are grouped by.
+    """
+
+    __slots__ = ('event_id', 'region', 'comuna', 'text')
+
+    def __init__(self, event: Dict):
+        """
+        Constructor of EncodedEvent.
+
+        :param event:
+            event data formatted, as responses list it.
+        """
+
+        self.event_id = event['event-id']
+        self.region = event['region']
+        self.comuna = event['comuna']
+        self.text = json.dumps(event)
+
+
+class Serializer:
+    """
+    JSON encoder of responses, along with the separators it writes, so that streamed
+    responses are written as the whole response would be.
+    """
+
+    item_separator = ', '
+    key_separator = ': '
+
+    def __init__(self):
+        """
+        Constructor of Serializer.
+        """
+
+        # encoded reference payloads by snapshot of reference data they were built from, and by request type
+        self._references: 'WeakKeyDictionary[Any, Dict[str, bytes]]' = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def dumps(value: Any) -> str:
+        """
+        :return:
+            value encoded as JSON text, encoded events written as they were encoded.
+        """
+
+        if isinstance(value, EncodedEvent):
+            return value.text
+
+        events: List[str] = []
+
+        def placeholder(item: Any) -> str:
+            if not isinstance(item, EncodedEvent):
+                raise TypeError(f'Object of type {type(item).__name__} is not JSON serializable')
+            events.append(item.text)
+            return f'{_placeholder}{len(events) - 1}'
+
+        text = json.dumps(value, default=placeholder)
+        if not events:
+            return text
+        return _placeholder_pattern.sub(lambda match: events[int(match.group(1))], text)
+
+    def encode(self, value: Any) -> bytes:
+        """
+        :return:
+            value encoded as UTF-8 JSON.
+        """
+
+        return self.dumps(value).encode('utf-8')
+
+    def encode_response(self, value: Any, reference: Any = None, request_type: str = '') -> bytes:
+        """
+        Encode a response, reusing bytes of a response built only from reference data while it's the same.
+
+        :param value:
+            response to encode.
+        :param reference:
+            snapshot of reference data response was built from, as db ReferenceData, None if built from events.
+        :param request_type:
+            type of request, payloads of a snapshot are told apart by it.
+
+        :return:
+            response encoded as UTF-8 JSON.
+        """
+
+        if reference is None:
+            return self.encode(value)
+
+        with self._lock:
+            payloads = self._references.setdefault(reference, {})
+            body = payloads.get(request_type)
+            if body is None:
+                body = payloads[request_type] = self.encode(value)
+            return body
+
+
+# serializer of responses of current process
+serializer = Serializer()
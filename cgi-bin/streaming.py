@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+streaming.py:
+    JSON encoding of responses whose events are read while the response is written.
+
+    A streamed response is a dictionary whose data is an iterator of events
+    instead of a list. It's encoded in chunks, each event as it's read from
+    database, so only a batch of events is held in memory whatever the number
+    of events, and the first bytes are sent before the last event is read.
+    Output is what the serializer gives for the whole response, with data as a list.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from conf import stream_chunk_size
+from serializer import serializer
+
+
+class ClosingIterator:
+    """
+    Iterator running a callback once, when exhausted, failed or closed.
+
+    WSGI servers close a response body even if it wasn't iterated, e.g. when
+    client disconnects, which a generator doesn't run its cleanup for.
+    """
+
+    def __init__(self, iterable: Iterable, callback: Callable[[], None]):
+        """
+        Constructor of ClosingIterator.
+
+        :param iterable:
+            values iterated.
+        :param callback:
+            function releasing what iteration holds, e.g. a database connection.
+        """
+
+        self._iterator = iter(iterable)
+        self._callback: Optional[Callable[[], None]] = callback
+
+    def __iter__(self) -> 'ClosingIterator':
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._callback is None:
+            return
+
+        callback, self._callback = self._callback, None
+        try:
+            if hasattr(self._iterator, 'close'):
+                self._iterator.close()
+        finally:
+            callback()
+
+
+def streamed(response: Any) -> bool:
+    """
+    :return:
+        whether response holds events still to be read.
+    """
+
+    return isinstance(response, dict) and isinstance(response.get('data'), Iterator)
+
+
+def encode_chunks(response: Any) -> Iterator[str]:
+    """
+    Encode a response as JSON, in chunks of about stream_chunk_size characters.
+
+    :param response:
+        response to encode, streamed or not.
+
+    :return:
+        iterator over JSON text of response.
+    """
+
+    if not streamed(response):
+        yield serializer.dumps(response)
+        return
+
+    buffer = []
+    size = 0
+    for part in _encode_parts(response):
+        buffer.append(part)
+        size += len(part)
+        if size >= stream_chunk_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _encode_parts(response: Dict) -> Iterator[str]:
+    """
+    :return:
+        iterator over JSON text of a streamed response, an event at a time.
+    """
+
+    dumps = serializer.dumps
+    item_separator = serializer.item_separator
+
+    yield '{'
+    for index, (key, value) in enumerate(response.items()):
+        yield f'{item_separator if index else ""}{dumps(key)}{serializer.key_separator}'
+        if key != 'data':
+            yield dumps(value)
+            continue
+
+        yield '['
+        for position, event in enumerate(value):
+            yield f'{item_separator if position else ""}{dumps(event)}'
+        yield ']'
+    yield '}'
@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+upload.py:
+    streaming parser of event submissions, a multipart/form-data body.
+
+    Image limits are checked while the body is read, instead of after it has
+    been spooled to disk: a request declaring more bytes than an event may take
+    is rejected before reading it, an image is checked for a valid type as soon
+    as its first bytes arrive, and an image that isn't valid, is too large or
+    exceeds the number of images allowed is discarded as it's read, so only
+    valid images are written to temporary files.
+"""
+
+import tempfile
+from email.message import Message
+from typing import BinaryIO, Callable, Dict, List, Tuple, Union
+
+import filetype
+
+from conf import maxfilesize, maxfilecount, maxfieldsize, maxrequestsize, magicsize, mimevalid
+from validation import event_validator
+
+# bytes read from request at once
+read_size = 64 * 1024
+# bytes of headers of a part
+max_header_size = 8 * 1024
+
+
+# fields whose response is a list, one for each input
+multiple_fields = ('foto-comida', 'red-social')
+
+
+class UploadRejected(ValueError):
+    """
+    Submission that can't be read as an event, message is shown to user.
+    """
+
+    def __init__(self, message: str, field: str = 'foto-comida'):
+        """
+        Constructor of UploadRejected.
+
+        :param message:
+            reason submission was rejected.
+        :param field:
+            field message is shown under, images if rejection isn't due to a field of event.
+        """
+
+        super().__init__(message)
+        self.field = field
+
+
+def rejected_response(error: UploadRejected) -> Tuple[bool, Dict]:
+    """
+    Response to a submission rejected before its fields were validated, in the form of a FormHandler one,
+    with the error under the field it's due to.
+
+    Fields left unvalidated aren't responded, except fields of multiple inputs, which front-end always
+    reads, responded with no input.
+    """
+
+    response = {field: (True, []) for field in multiple_fields}
+    field = error.field if error.field in event_validator.fields else 'foto-comida'
+    response[field] = (False, [(False, str(error))] if field in multiple_fields else str(error))
+    return False, response
+
+
+class UploadedFile:
+    """
+    Image part of a submission, exposing the attributes of a cgi FieldStorage upload.
+
+    If image was discarded while read, error holds the reason and file is left empty.
+    """
+
+    def __init__(self, filename: str):
+        """
+        Constructor of UploadedFile.
+
+        :param filename:
+            name of file submitted.
+        """
+
+        self.filename = filename
+        self.file = tempfile.TemporaryFile()
+        self.error = ''
+        self._size = 0
+        self._head = bytearray()  # first bytes of image, until its type is known
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Append a chunk of image, checking type once enough bytes are known and size on every chunk.
+        """
+
+        if self.error:
+            return
+
+        self._size += len(chunk)
+        if self._size > maxfilesize:
+            self.reject(f'Tamaño del archivo excede el máximo {maxfilesize / 1000000:.3f} MB.')
+            return
+
+        if self._head is not None:
+            self._head += chunk
+            if len(self._head) >= magicsize:
+                self._check_type()
+            return
+
+        self.file.write(chunk)
+
+    def finish(self) -> None:
+        """
+        End image once its part is read, checking type of images smaller than signatures read.
+        """
+
+        if self._head is not None and not self.error and self.filename:
+            self._check_type()
+        self.file.seek(0, 0)
+
+    def reject(self, message: str) -> None:
+        """
+        Discard image, bytes still to arrive are ignored.
+        """
+
+        self.error = message
+        self._head = None
+        self.file.close()
+        self.file = tempfile.TemporaryFile()
+
+    def _check_type(self) -> None:
+        real_type = filetype.guess(bytes(self._head))
+        if real_type is None or real_type.mime not in mimevalid:
+            self.reject('Extensión del archivo debe ser (.jpg .jpeg .png).')
+            return
+
+        self.file.write(self._head)
+        self._head = None
+
+
+class MultipartForm:
+    """
+    Fields of a multipart/form-data submission, exposing the cgi FieldStorage methods that
+    form validation and registration read.
+    """
+
+    def __init__(self, fp: BinaryIO, environ: Dict[str, str]):
+        """
+        Constructor of MultipartForm, reads whole submission.
+
+        :param fp:
+            binary stream of request body.
+        :param environ:
+            CGI or WSGI environment of request, with CONTENT_TYPE and CONTENT_LENGTH.
+
+        :raise UploadRejected:
+            if submission isn't multipart, or is larger than an event may take.
+        """
+
+        content_type = Message()
+        content_type['content-type'] = environ.get('CONTENT_TYPE', '')
+        boundary = content_type.get_param('boundary')
+        if content_type.get_content_type() != 'multipart/form-data' or not boundary:
+            raise UploadRejected('Formulario no válido.')
+
+        try:
+            self._remaining = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise UploadRejected('Formulario no válido.')
+        if self._remaining > maxrequestsize:
+            raise UploadRejected(f'Tamaño del formulario excede el máximo {maxrequestsize / 1000000:.3f} MB.')
+
+        self._fp = fp
+        self._buffer = bytearray()
+        self._values: Dict[str, List[Union[str, UploadedFile]]] = {}
+        self._images = 0
+
+        self._parse(boundary.encode('latin-1'))
+
+    def getfirst(self, key: str, default=None):
+        values = self._values.get(key)
+        return values[0] if values else default
+
+    def getlist(self, key: str) -> List[Union[str, UploadedFile]]:
+        return list(self._values.get(key, []))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __getitem__(self, key: str):
+        values = self._values[key]
+        return values if len(values) > 1 else values[0]
+
+    def _parse(self, boundary: bytes) -> None:
+        """
+        Read every part of body, from its first delimiter to the closing one.
+        """
+
+        self._stream_until(b'--' + boundary, lambda chunk: None)  # preamble is ignored
+        delimiter = b'\r\n--' + boundary
+
+        while True:
+            self._fill(2)
+            if self._buffer[:2] == b'--':  # closing delimiter, epilogue is ignored
+                return
+
+            headers = Message()
+            for line in self._read_until(b'\r\n\r\n', max_header_size).decode('utf-8', 'replace').split('\r\n'):
+                name, _, value = line.partition(':')
+                if value:
+                    headers[name.strip()] = value.strip()
+
+            name = headers.get_param('name', header='content-disposition')
+            filename = headers.get_filename()
+
+            if filename is None:
+                value = bytearray()
+                self._stream_until(delimiter, lambda chunk: self._append_field(name, value, chunk))
+                self._values.setdefault(name, []).append(value.decode('utf-8', 'replace'))
+                continue
+
+            image = UploadedFile(filename)
+            if filename:  # empty file inputs are sent with no name and no content
+                self._images += 1
+                if self._images > maxfilecount:
+                    image.reject(f'Máximo {maxfilecount} imágenes.')
+            self._stream_until(delimiter, image.write)
+            image.finish()
+            self._values.setdefault(name, []).append(image)
+
+    @staticmethod
+    def _append_field(name: str, value: bytearray, chunk: bytes) -> None:
+        value += chunk
+        if len(value) > maxfieldsize:
+            raise UploadRejected('Largo máximo de caracteres excedido.', field=name)
+
+    def _fill(self, size: int) -> bool:
+        """
+        Read from request until buffer holds size bytes.
+
+        :return:
+            whether buffer holds them, False once body ended.
+        """
+
+        while len(self._buffer) < size:
+            if self._remaining <= 0:
+                return False
+            chunk = self._fp.read(min(read_size, self._remaining))
+            if not chunk:
+                return False
+            self._remaining -= len(chunk)
+            self._buffer += chunk
+        return True
+
+    def _read_until(self, marker: bytes, limit: int) -> bytes:
+        """
+        Take bytes from body up to a marker, which is consumed.
+
+        :raise UploadRejected:
+            if marker isn't found within limit bytes.
+        """
+
+        while True:
+            index = self._buffer.find(marker)
+            if index >= 0:
+                value = bytes(self._buffer[:index])
+                del self._buffer[:index + len(marker)]
+                return value
+            if len(self._buffer) > limit or not self._fill(len(self._buffer) + 1):
+                raise UploadRejected('Formulario no válido.')
+
+    def _stream_until(self, marker: bytes, sink: Callable[[bytes], None]) -> None:
+        """
+        Pass bytes from body to sink as they arrive, up to a marker, which is consumed.
+
+        A marker may be split between reads, so its length minus one byte is kept back.
+
+        :raise UploadRejected:
+            if body ends before marker.
+        """
+
+        while True:
+            index = self._buffer.find(marker)
+            if index >= 0:
+                if index:
+                    sink(bytes(self._buffer[:index]))
+                del self._buffer[:index + len(marker)]
+                return
+
+            keep = len(marker) - 1
+            if len(self._buffer) > keep:
+                sink(bytes(self._buffer[:-keep]))
+                del self._buffer[:-keep]
+            if not self._fill(len(self._buffer) + 1):
+                raise UploadRejected('Formulario no válido.')
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from cgi import FieldStorage
-from typing import Dict, Union
+from typing import Dict, Union, Optional
 
 from conf import host, user, password, database
 from db import EventDatabase
+from streaming import ClosingIterator, streamed
 
 # allowed request types
 request_types = ['regions-comunas',
@@ -17,7 +18,10 @@ request_types = ['regions-comunas',
                  'events-per-day',
                  'events-per-type',
                  'events-month-daytime',
-                 'events']
+                 'events',
+                 'search',
+                 'events-nearby',
+                 'events-summary']
 
 
 class URLParamHandler:
@@ -30,35 +34,72 @@ class URLParamHandler:
     return it.
     """
 
-    def __init__(self, params: FieldStorage):
+    def __init__(self, params: FieldStorage, db: Optional[EventDatabase] = None, stream: bool = False):
         """
         Constructor for URLParamHandler.
 
         :param params:
             URL params in a cgi FieldStorage.
+        :param db:
+            database handler to query, if None a new connection is established.
+        :param stream:
+            whether events listed without a limit are read while response is written, see streaming.py.
         """
 
         self._params: FieldStorage = params  # store params
         self._request: Dict = self.__resolve_params()  # determine type of query
-
-        self._db = EventDatabase(host=host,  # connect with database
-                                 user=user,
-                                 password=password,
-                                 database=database)
-
-        self._response = self.__resolve_request()  # query database and construct response
-
-    def __resolve_params(self) -> Dict[str, Union[str, None]]:
+        self._stream = stream
+        self._reference = None  # reference data snapshot response was built from, if only from it
+
+        self._db = db or EventDatabase(host=host,  # connect with database
+                                       user=user,
+                                       password=password,
+                                       database=database)
+
+        owns_db = db is None
+        try:
+            self._response = self.__resolve_request()  # query database and construct response
+            if owns_db and streamed(self._response):  # connection is given back once events are read
+                self._response['data'] = ClosingIterator(self._response['data'], self._db.close)
+                owns_db = False
+        finally:
+            if owns_db:  # give back connection opened by handler
+                self._db.close()
+
+    def __resolve_params(self) -> Dict[str, Union[str, bool, Dict, None]]:
         """
         :return:
-            determine type, limit and offset values for request.
+            determine type, limit, offset and other values for request.
         """
 
         request = self._params.getfirst('type', None)
         limit = self._params.getfirst('limit', None)
         offset = self._params.getfirst('offset', None)
+        after = self._params.getfirst('after', None)
         comuna = self._params.getfirst('comuna', None)
         event_id = self._params.getfirst('id', None)
+        with_count = self._params.getfirst('count', 'true').lower() not in ('0', 'false')
+        search = {  # text and filters of a search
+            'text': self._params.getfirst('q', None),
+            'region': self._params.getfirst('region', None),
+            'comuna': comuna,
+            'food_type': self._params.getfirst('food-type', None),
+            'start': self._params.getfirst('from', None),
+            'end': self._params.getfirst('to', None)
+        }
+
+        summary = {  # set of comunas of a map summary, by name or in a box
+            'comunas': self._params.getlist('comuna'),
+            'region': self._params.getfirst('region', None),
+            'bbox': self._params.getfirst('bbox', None),
+            'per_comuna': self._params.getfirst('per-comuna', None)
+        }
+        view = {  # map view, a circle or a box
+            'lat': self._params.getfirst('lat', None),
+            'lng': self._params.getfirst('lng', None),
+            'radius': self._params.getfirst('radius', None),
+            'bbox': self._params.getfirst('bbox', None)
+        }
 
         if request not in request_types:  # limited types of request permitted
             request = None
@@ -67,8 +108,13 @@ class URLParamHandler:
             'type': request,
             'limit': limit,
             'offset': offset,
+            'after': after,
             'comuna': comuna,
-            'event_id': event_id
+            'event_id': event_id,
+            'with_count': with_count,
+            'search': search,
+            'view': view,
+            'summary': summary
         }
 
     def __resolve_request(self):
@@ -85,6 +131,9 @@ class URLParamHandler:
                 'values': request_types
             }
 
+        if request_type in request_types[:3]:  # responses read from cached reference data only
+            self._reference = self._db.reference_data
+
         if request_type == request_types[0]:  # regions and comunas names
             return {
                 'regions': self._db.get_regions(name_only=True),
@@ -102,11 +151,13 @@ class URLParamHandler:
 
         if request_type == request_types[4]:  # events of a comuna
             comuna = self._request.get('comuna')
-            return self._db.get_events_by_comuna(comuna_name=comuna)
+            with_count = self._request.get('with_count')
+            limit = self._request.get('limit')
+            return self._db.get_events_by_comuna(comuna_name=comuna, with_count=with_count, limit=limit)
 
         if request_type == request_types[5]:  # event data by id
             event_id_str = self._request.get('event_id')
-            event_id = int(event_id_str) if event_id_str else None
+            event_id = int(event_id_str) if event_id_str and event_id_str.isdecimal() else None
             return self._db.get_event_by_id(event_id=event_id)
 
         if request_type == request_types[6]:  # event count per starting date
@@ -118,11 +169,28 @@ class URLParamHandler:
         if request_type == request_types[8]:  # event count per month and daytime
             return self._db.get_event_count_by_month()
 
-        # events data with optional limit and offset
+        if request_type == request_types[10]:  # events matching a search, with optional limit and cursor
+            return self._db.search_events(**self._request.get('search'),
+                                          limit=self._request.get('limit'),
+                                          after=self._request.get('after'))
+
+        if request_type == request_types[11]:  # event counts per comuna and latest events in a map view
+            return self._db.get_events_nearby(**self._request.get('view'), limit=self._request.get('limit'))
+
+        if request_type == request_types[12]:  # counts and latest events of every comuna of a set
+            return self._db.get_events_summary(**self._request.get('summary'))
+
+        # events data with optional limit and either offset or cursor
         request_limit = self._request.get('limit')
         request_offset = self._request.get('offset')
+        request_after = self._request.get('after')
+        with_count = self._request.get('with_count')
 
-        return self._db.get_events(limit=request_limit, offset=request_offset)
+        return self._db.get_events(limit=request_limit,
+                                   offset=request_offset,
+                                   after=request_after,
+                                   with_count=with_count,
+                                   stream=self._stream)
 
     @property
     def response(self):
@@ -132,3 +200,22 @@ class URLParamHandler:
         """
 
         return self._response
+
+    @property
+    def request_type(self) -> Optional[str]:
+        """
+        :return:
+            property returning type of request, None if it isn't valid.
+        """
+
+        return self._request.get('type')
+
+    @property
+    def reference(self):
+        """
+        :return:
+            property returning snapshot of reference data response was built from, as db ReferenceData,
+            None if response was built from events.
+        """
+
+        return self._reference
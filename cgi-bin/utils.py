@@ -1,15 +1,22 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import base64
+import binascii
+import math
 import os
 from cgi import FieldStorage
 from datetime import datetime
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Sequence
 from urllib.parse import urlparse
 
 import filetype
 
-from conf import datetimeformat, maxfilesize, mimevalid
+from conf import maxfilesize, mimevalid, datetimeformat
+from metrics import upload_bytes, upload_rejects
+
+# datetime format of event cursors, seconds included to match database precision
+cursorformat = '%Y-%m-%d %H:%M:%S'
 
 
 def check_social_network_link(social_network_link: str,
@@ -103,9 +110,9 @@ def resolve_hostname(hostname: Optional[str], allowed: List[str]) -> str:
     return cleaned_hostname
 
 
-def datetime_has_format(date: str, dateformat: str) -> bool:
+def parse_datetime(date: str, dateformat: str) -> Optional[datetime]:
     """
-    Check if a date has an expected format.
+    Read a date with an expected format.
 
     :param date:
         string expected to be a date.
@@ -113,33 +120,13 @@ def datetime_has_format(date: str, dateformat: str) -> bool:
         format expected for date.
 
     :return:
-        bool - whether string date has expected format.
+        datetime - date read, None if string doesn't have expected format.
     """
 
     try:
-        datetime.strptime(date, dateformat)
-        return True
+        return datetime.strptime(date, dateformat)
     except ValueError:
-        return False
-
-
-def dates_are_ordered(first_date: str, second_date: str) -> bool:
-    """
-    Check if one date occurs before the other.
-
-    :param first_date:
-        date expected to occur first.
-    :param second_date:
-        date expected to occur after first_date.
-
-    :return:
-        bool - whether first_date occurs before second_date.
-    """
-
-    firstdatefmt = datetime.strptime(first_date, datetimeformat)
-    seconddatefmt = datetime.strptime(second_date, datetimeformat)
-
-    return firstdatefmt < seconddatefmt
+        return None
 
 
 def check_image(fileitem: FieldStorage) -> Tuple[bool, str]:
@@ -160,19 +147,156 @@ def check_image(fileitem: FieldStorage) -> Tuple[bool, str]:
     if not fileitem.filename:  # no file was submitted
         return valid, message
 
+    if getattr(fileitem, 'error', ''):  # discarded while submission was read
+        upload_rejects.inc('discarded')
+        return valid, fileitem.error
+
     try:
         size = os.fstat(fileitem.file.fileno()).st_size  # file size
         real_type = filetype.guess(fileitem.file)  # mime type
         fileitem.file.seek(0, 0)  # return pointer to beginning of file
 
-        if not (real_type.mime in mimevalid):
+        if real_type is None or real_type.mime not in mimevalid:
             message = 'Extensión del archivo debe ser (.jpg .jpeg .png).'
+            upload_rejects.inc('type')
         elif size > maxfilesize:
             message = f'Tamaño del archivo {size / 1000000:.3f} MB excede el máximo {maxfilesize / 1000000:.3f} MB.'
+            upload_rejects.inc('size')
         else:
             message = ''
             valid = True
+            upload_bytes.inc(amount=size)
     except IOError:
         message = 'Error al leer el archivo.'  # error while trying to read file
+        upload_rejects.inc('read')
 
     return valid, message
+
+
+def format_datetimes(values: Sequence[datetime]) -> List[str]:
+    """
+    Format datetimes of a batch of rows as datetimeformat, every distinct value once.
+
+    :param values:
+        datetimes to format.
+
+    :return:
+        list - formatted datetimes, in same order.
+    """
+
+    if datetimeformat == '%Y-%m-%d %H:%M':
+        def format_value(value: datetime) -> str:
+            return value.isoformat(' ', 'minutes')  # same text, without parsing a format
+    else:
+        def format_value(value: datetime) -> str:
+            return value.strftime(datetimeformat)
+
+    formatted = {}
+    for value in values:
+        if value not in formatted:
+            formatted[value] = format_value(value)
+    return [formatted[value] for value in values]
+
+
+def encode_cursor(start_date: datetime, event_id: int) -> str:
+    """
+    Build an opaque pagination token from the sort key of an event.
+
+    :param start_date:
+        start datetime of last event of a page.
+    :param event_id:
+        id of last event of a page.
+
+    :return:
+        str - url safe token to request page that follows event.
+    """
+
+    key = f'{start_date.strftime(cursorformat)}|{event_id}'
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(token: str) -> Optional[Tuple[str, int]]:
+    """
+    Read sort key of an event from a pagination token.
+
+    :param token:
+        token built by encode_cursor.
+
+    :return:
+        tuple - start datetime as a database string and event id, None if token is not valid.
+    """
+
+    try:
+        start_date, event_id = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+        start_date = datetime.strptime(start_date, cursorformat).strftime(cursorformat)
+        return start_date, int(event_id)
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+
+
+def encode_search_cursor(relevance: float, event_id: int) -> str:
+    """
+    Build an opaque pagination token from the sort key of a search result.
+
+    :param relevance:
+        relevance of last event of a page.
+    :param event_id:
+        id of last event of a page.
+
+    :return:
+        str - url safe token to request page that follows event.
+    """
+
+    key = f'{relevance!r}|{event_id}'  # repr keeps every digit, so relevance compares equal when read back
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_search_cursor(token: str) -> Optional[Tuple[float, int]]:
+    """
+    Read sort key of a search result from a pagination token.
+
+    :param token:
+        token built by encode_search_cursor.
+
+    :return:
+        tuple - relevance and event id, None if token is not valid.
+    """
+
+    try:
+        relevance, event_id = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+        relevance = float(relevance)
+        if not math.isfinite(relevance):  # float reads nan and inf, which no relevance compares with
+            return None
+        return relevance, int(event_id)
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+
+
+def box_around(lat: float, lng: float, radius: float) -> Tuple[float, float, float, float]:
+    """
+    Box of longitudes and latitudes that contains a circle on earth surface.
+
+    :param lat:
+        latitude of center, in degrees.
+    :param lng:
+        longitude of center, in degrees.
+    :param radius:
+        radius of circle, in kilometers.
+
+    :return:
+        tuple - west, south, east and north bounds of box, in degrees.
+    """
+
+    lat_span = radius / 111.32  # kilometers per degree of latitude
+    lng_span = min(180.0, radius / max(111.32 * math.cos(math.radians(lat)), 1e-6))
+
+    return clamp_box(lng - lng_span, lat - lat_span, lng + lng_span, lat + lat_span)
+
+
+def clamp_box(west: float, south: float, east: float, north: float) -> Tuple[float, float, float, float]:
+    """
+    :return:
+        box limited to valid longitudes and latitudes.
+    """
+
+    return max(west, -180.0), max(south, -90.0), min(east, 180.0), min(north, 90.0)
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+validation.py:
+    rules that event submissions are checked with, by the event form and bulk imports.
+
+    Every field has a rule, a check that may read results of the fields it depends
+    on. Rules are ordered and patterns compiled once when module is imported, and a
+    submission is validated in a single pass, each field checked exactly once.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from conf import emailregex, phoneregex, datetimeformat, maxfilecount
+from utils import parse_datetime, check_image, check_social_network_link
+
+# response for a field, whether it's valid and a message otherwise, or a list of them for multiple inputs
+Check = Tuple[bool, Any]
+
+email_pattern = re.compile(emailregex)
+phone_pattern = re.compile(phoneregex)
+
+
+class Submission:
+    """
+    Submission being validated, with results of fields already checked.
+    """
+
+    def __init__(self, post_data, reference):
+        """
+        Constructor of Submission.
+
+        :param post_data:
+            data submitted, a cgi FieldStorage or object with same interface.
+        :param reference:
+            valid regions, comunas, food types and social networks, as db ReferenceData.
+        """
+
+        self.post_data = post_data
+        self.reference = reference
+        self.results: Dict[str, Check] = {}
+        self.dates: Dict[str, datetime] = {}  # dates already parsed by their checks
+
+    def value(self, field: str) -> str:
+        return self.post_data.getfirst(field, '')
+
+    def valid(self, field: str) -> bool:
+        return self.results[field][0]
+
+
+class Rule:
+    """
+    Check of a field, and fields that must be checked before.
+    """
+
+    def __init__(self, field: str, check: Callable[[Submission], Check], depends: Sequence[str] = ()):
+        """
+        Constructor of Rule.
+
+        :param field:
+            name of field checked, as submitted.
+        :param check:
+            function returning response of field for a submission.
+        :param depends:
+            fields whose results check reads.
+        """
+
+        self.field = field
+        self.check = check
+        self.depends = tuple(depends)
+
+
+class Validator:
+    """
+    Set of rules, ordered so that every field is checked after the fields it depends on.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        """
+        Constructor of Validator.
+
+        :param rules:
+            rule of every field, in the order fields are responded.
+        """
+
+        self._fields = [rule.field for rule in rules]
+        by_field = {rule.field: rule for rule in rules}
+
+        self._rules: List[Rule] = []
+        visiting = set()
+
+        def visit(rule: Rule) -> None:
+            if rule in self._rules:
+                return
+            if rule.field in visiting:
+                raise ValueError(f'Circular dependency on field {rule.field}.')
+            visiting.add(rule.field)
+            for dependency in rule.depends:
+                visit(by_field[dependency])
+            self._rules.append(rule)
+
+        for rule in rules:
+            visit(rule)
+
+    @property
+    def fields(self) -> List[str]:
+        """
+        :return:
+            property returning every field checked, in the order fields are responded.
+        """
+
+        return list(self._fields)
+
+    def validate(self, post_data, reference) -> Tuple[bool, Dict[str, Check]]:
+        """
+        Check every field of a submission once.
+
+        :param post_data:
+            data submitted, a cgi FieldStorage or object with same interface.
+        :param reference:
+            valid regions, comunas, food types and social networks, as db ReferenceData.
+
+        :return:
+            bool - whether submission is valid. <br>
+            dict - response for every field.
+        """
+
+        submission = Submission(post_data, reference)
+        for rule in self._rules:
+            submission.results[rule.field] = rule.check(submission)
+
+        response = {field: submission.results[field] for field in self._fields}
+        return all(valid for valid, _ in response.values()), response
+
+
+def check_region(submission: Submission) -> Check:
+    region = submission.value('region')
+
+    if region in submission.reference.region_ids:
+        return True, ''
+    elif region == '':
+        return False, 'Debe seleccionar una región.'
+    return False, 'La región seleccionada no es una opción válida.'
+
+
+def check_comuna(submission: Submission) -> Check:
+    comuna = submission.value('comuna')
+
+    if not submission.valid('region'):
+        return False, 'Chequear región.'
+    elif submission.value('region') in submission.reference.comuna_regions.get(comuna, ()):
+        return True, ''
+    elif comuna == '':
+        return False, 'Debe seleccionar una comuna.'
+    return False, 'La comuna seleccionada no es una opción válida.'
+
+
+def check_sector(submission: Submission) -> Check:
+    if len(submission.value('sector')) <= 100:
+        return True, ''
+    return False, 'Largo máximo de caracteres excedido.'
+
+
+def check_name(submission: Submission) -> Check:
+    name = submission.value('nombre')
+
+    if name == '':
+        return False, 'Debe ingresar un nombre de contacto.'
+    elif not (3 <= len(name) <= 200):
+        return False, 'Al menos 3 caracteres, máximo 200.'
+    return True, ''
+
+
+def check_email(submission: Submission) -> Check:
+    email = submission.value('email')
+
+    if email == '':
+        return False, 'Debe ingresar un email.'
+    elif not email_pattern.fullmatch(email):
+        return False, 'Formato de email no válido.'
+    return True, ''
+
+
+def check_phone_number(submission: Submission) -> Check:
+    phone_number = submission.value('celular')
+
+    if phone_number and not phone_pattern.fullmatch(phone_number):
+        return False, 'Número de celular no válido, ver ejemplo.'
+    return True, ''
+
+
+def check_description(submission: Submission) -> Check:
+    if len(submission.value('descripcion-evento')) <= 1000:
+        return True, ''
+    return False, 'Largo máximo de caracteres excedido.'
+
+
+def check_food_type(submission: Submission) -> Check:
+    food_type = submission.value('tipo-comida')
+
+    if food_type in submission.reference.food_type_set:
+        return True, ''
+    elif food_type == '':
+        return False, 'Debe seleccionar un tipo de comida.'
+    return False, 'El tipo seleccionado no es válido.'
+
+
+def read_date(submission: Submission, field: str) -> Optional[datetime]:
+    """
+    Parse a date field once, keeping it for fields that depend on it.
+
+    :return:
+        date submitted, None if it doesn't have expected format.
+    """
+
+    value = submission.value(field)
+    date = parse_datetime(value, datetimeformat) if len(value) == 16 else None
+    if date:
+        submission.dates[field] = date
+    return date
+
+
+def check_open_date(submission: Submission) -> Check:
+    if submission.value('dia-hora-inicio') == '':
+        return False, 'Debe ingresar la fecha de inicio del evento.'
+    elif not read_date(submission, 'dia-hora-inicio'):
+        return False, 'Formato incorrecto, ver ejemplo.'
+    return True, ''
+
+
+def check_close_date(submission: Submission) -> Check:
+    if submission.value('dia-hora-termino') == '':
+        return False, 'Debe ingresar la fecha de término del evento.'
+
+    close_date = read_date(submission, 'dia-hora-termino')
+    if not close_date:
+        return False, 'Formato incorrecto, ver ejemplo.'
+    elif not submission.valid('dia-hora-inicio'):
+        return False, 'Chequear la fecha de inicio.'
+    elif not submission.dates['dia-hora-inicio'] < close_date:
+        return False, 'El término debe ser después del inicio del evento.'
+    return True, ''
+
+
+def check_images(submission: Submission) -> Check:
+    if 'foto-comida' not in submission.post_data:
+        return False, [(False, 'Subir una imagen.')]
+
+    images = submission.post_data['foto-comida']
+    if not isinstance(images, list):
+        images = [images]
+
+    response = [
+        check_image(image) if idx < maxfilecount else (False, f'Máximo {maxfilecount} imágenes.')
+        for idx, image in enumerate(images)
+    ]
+    return all(valid for valid, _ in response), response
+
+
+def check_social_networks(submission: Submission) -> Check:
+    response = []
+    already_considered = []
+
+    for social_network in submission.post_data.getlist('red-social'):
+        valid, message, sn = check_social_network_link(social_network,
+                                                       already_considered,
+                                                       submission.reference.social_networks)
+        response.append((valid, message))
+        if sn:
+            already_considered.append(sn)
+
+    return all(valid for valid, _ in response), response
+
+
+# rules of an event, in the order fields are responded to front-end
+event_validator = Validator([
+    Rule('region', check_region),
+    Rule('comuna', check_comuna, depends=['region']),
+    Rule('sector', check_sector),
+    Rule('nombre', check_name),
+    Rule('email', check_email),
+    Rule('celular', check_phone_number),
+    Rule('descripcion-evento', check_description),
+    Rule('tipo-comida', check_food_type),
+    Rule('dia-hora-inicio', check_open_date),
+    Rule('dia-hora-termino', check_close_date, depends=['dia-hora-inicio']),
+    Rule('foto-comida', check_images),
+    Rule('red-social', check_social_networks),
+])
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+wsgi.py:
+    long-lived application entry point that serves the same routes as the cgi scripts.
+
+    Modules are imported once per worker, and database connections are kept in the
+    worker pool instead of being established once per request. Run with any WSGI
+    server from inside cgi-bin, e.g.
+
+        gunicorn --workers 4 wsgi:application
+"""
+
+import atexit
+import cgi
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterable, List, Tuple, Any, Union
+from urllib.parse import parse_qs
+
+from conf import cache_control
+from db import data_version
+from formhandler import FormHandler
+from httpcache import cache_key, etag, not_modified, response_cache
+from metrics import cache_lookup, content_type, registry, request_type, track_request
+from pool import close_pools
+from querylog import request_log
+from serializer import serializer
+from streaming import ClosingIterator, encode_chunks, streamed
+from upload import MultipartForm, UploadRejected, rejected_response
+from urlparamhandler import URLParamHandler, request_types
+
+# connections are kept in process pool between requests, close them when worker exits
+atexit.register(close_pools)
+
+# status, headers and body of a response, encoded whole or in chunks as it's streamed
+Response = Tuple[str, List[Tuple[str, str]], Union[bytes, Iterable[bytes]]]
+
+# headers of every JSON response, as printed by cgi scripts
+json_headers = [('Content-type', 'application/json; charset=UTF-8')]
+
+
+def encode(response: Any) -> bytes:
+    """
+    :return:
+        response encoded as JSON, as cgi scripts print it.
+    """
+
+    return serializer.encode(response)
+
+
+def data_api(environ: Dict) -> Response:
+    """
+    Serve data requests, same contract as dataAPI.py.
+
+    Read-only requests are answered from worker memory while data version
+    doesn't change, or with 304 Not Modified if client holds current response.
+    Events listed without a limit are streamed.
+
+    :param environ:
+        WSGI environment of request.
+
+    :return:
+        status, headers and body of response.
+    """
+
+    query_params = cgi.FieldStorage(environ=environ)
+
+    key = cache_key(query_params)
+    if key is None:
+        handler = URLParamHandler(query_params, stream=True)
+        response = handler.response
+        if streamed(response):
+            chunks = (chunk.encode('utf-8') for chunk in encode_chunks(response))
+            return '200 OK', json_headers, ClosingIterator(chunks, response['data'].close)
+        return '200 OK', json_headers, serializer.encode_response(response, handler.reference, handler.request_type)
+
+    version = data_version()
+    tag = etag(key, version)
+    headers = [('ETag', tag), ('Cache-Control', cache_control)]
+
+    client_holds = not_modified(environ.get('HTTP_IF_NONE_MATCH'), tag)
+    cache_lookup('etag', client_holds)
+    if client_holds:
+        return '304 Not Modified', headers, b''
+
+    body = response_cache.get(key, version)
+    if body is None:
+        handler = URLParamHandler(query_params)
+        body = serializer.encode_response(handler.response, handler.reference, handler.request_type)
+        response_cache.put(key, version, body)
+
+    return '200 OK', json_headers + headers, body
+
+
+def register_event(environ: Dict) -> Response:
+    """
+    Serve event registration, same contract as register_event.py.
+
+    :param environ:
+        WSGI environment of request.
+
+    :return:
+        status, headers and body of response.
+    """
+
+    try:
+        form = MultipartForm(environ['wsgi.input'], environ)
+    except UploadRejected as e:
+        return '200 OK', json_headers, encode(rejected_response(e))
+    return '200 OK', json_headers, encode(FormHandler(post_data=form).response)
+
+
+def metrics_api(environ: Dict) -> Response:
+    """
+    Serve metrics of every process, same contract as metricsAPI.py.
+
+    :param environ:
+        WSGI environment of request.
+
+    :return:
+        status, headers and body of response.
+    """
+
+    return '200 OK', [('Content-type', content_type)], registry.exposition()
+
+
+# routes served, paths kept from cgi scripts so front-end needs no changes
+routes: Dict[str, Callable[[Dict], Response]] = {
+    '/cgi-bin/dataAPI.py': data_api,
+    '/cgi-bin/register_event.py': register_event,
+    '/cgi-bin/metricsAPI.py': metrics_api,
+    '/metrics': metrics_api,  # default path scraped by Prometheus
+}
+
+
+def application(environ: Dict, start_response: Callable[[str, List[Tuple[str, str]]], Any]) -> Iterable[bytes]:
+    """
+    WSGI callable.
+
+    :param environ:
+        WSGI environment of request.
+    :param start_response:
+        WSGI callback to set status and headers.
+
+    :return:
+        body of response.
+    """
+
+    path = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+    if path not in routes:
+        path = environ.get('PATH_INFO', '')
+    route = routes.get(path)
+
+    if route is None:
+        status, headers, body = '404 Not Found', json_headers, encode({'response': 'not found', 'values': list(routes)})
+    else:
+        query_string = environ.get('QUERY_STRING', '')
+        data_type = request_type(request_types, parse_qs(query_string).get('type', [''])[0]) \
+            if route is data_api else ''
+        with ExitStack() as tracking:
+            request = tracking.enter_context(track_request(path, data_type))
+            tracking.enter_context(request_log(f'{path}?{query_string}'))
+            status, headers, body = route(environ)
+            request.status = status.split(' ', 1)[0]
+
+            if not isinstance(body, bytes):  # request is tracked until its body is written
+                body = ClosingIterator(body, tracking.pop_all().close)
+
+    if not isinstance(body, bytes):
+        start_response(status, headers)
+        return body
+
+    start_response(status, headers + [('Content-Length', str(len(body)))])
+    return [body]
@@ -0,0 +1,353 @@
+-- Location of every comuna, as a point of longitude and latitude.
+-- Run after region-comuna.sql. On a database created before comuna had a location, first run:
+--   ALTER TABLE comuna ADD COLUMN `ubicacion` POINT NULL SRID 0;
+
+UPDATE comuna SET ubicacion = POINT(-69.4166667, -19.3000000) WHERE id = 10301;
+UPDATE comuna SET ubicacion = POINT(-69.7666667, -19.9666667) WHERE id = 10302;
+UPDATE comuna SET ubicacion = POINT(-69.7833333, -20.2666667) WHERE id = 10303;
+UPDATE comuna SET ubicacion = POINT(-70.1666667, -20.2166667) WHERE id = 10304;
+UPDATE comuna SET ubicacion = POINT(-69.3333333, -20.5000000) WHERE id = 10305;
+UPDATE comuna SET ubicacion = POINT(-68.6166667, -19.2666667) WHERE id = 10306;
+UPDATE comuna SET ubicacion = POINT(-70.1166667, -20.2500000) WHERE id = 10307;
+UPDATE comuna SET ubicacion = POINT(-70.2000000, -22.0666667) WHERE id = 20101;
+UPDATE comuna SET ubicacion = POINT(-69.6666667, -22.3500000) WHERE id = 20102;
+UPDATE comuna SET ubicacion = POINT(-68.2666667, -21.2166667) WHERE id = 20201;
+UPDATE comuna SET ubicacion = POINT(-68.9166667, -22.4666667) WHERE id = 20202;
+UPDATE comuna SET ubicacion = POINT(-68.2166667, -22.9166667) WHERE id = 20203;
+UPDATE comuna SET ubicacion = POINT(-69.3166667, -22.8833333) WHERE id = 20301;
+UPDATE comuna SET ubicacion = POINT(-70.4500000, -23.1000000) WHERE id = 20302;
+UPDATE comuna SET ubicacion = POINT(-70.4000000, -23.6333333) WHERE id = 20303;
+UPDATE comuna SET ubicacion = POINT(-69.7666667, -25.2833333) WHERE id = 20304;
+UPDATE comuna SET ubicacion = POINT(-70.0500000, -26.3666667) WHERE id = 30101;
+UPDATE comuna SET ubicacion = POINT(-70.6000000, -26.3333333) WHERE id = 30102;
+UPDATE comuna SET ubicacion = POINT(-70.8166667, -27.0666667) WHERE id = 30201;
+UPDATE comuna SET ubicacion = POINT(-70.3166667, -27.3666667) WHERE id = 30202;
+UPDATE comuna SET ubicacion = POINT(-70.2666667, -27.4666667) WHERE id = 30203;
+UPDATE comuna SET ubicacion = POINT(-71.2166667, -28.4500000) WHERE id = 30301;
+UPDATE comuna SET ubicacion = POINT(-71.0666667, -28.5000000) WHERE id = 30302;
+UPDATE comuna SET ubicacion = POINT(-70.7500000, -28.5666667) WHERE id = 30303;
+UPDATE comuna SET ubicacion = POINT(-70.4622222, -28.9336111) WHERE id = 30304;
+UPDATE comuna SET ubicacion = POINT(-71.2666667, -29.5000000) WHERE id = 40101;
+UPDATE comuna SET ubicacion = POINT(-71.2500000, -29.9000000) WHERE id = 40102;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -30.0166667) WHERE id = 40103;
+UPDATE comuna SET ubicacion = POINT(-70.5166667, -30.0166667) WHERE id = 40104;
+UPDATE comuna SET ubicacion = POINT(-71.3333333, -29.9500000) WHERE id = 40105;
+UPDATE comuna SET ubicacion = POINT(-71.0833333, -30.2166667) WHERE id = 40106;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -30.2666667) WHERE id = 40201;
+UPDATE comuna SET ubicacion = POINT(-71.2000000, -30.5833333) WHERE id = 40202;
+UPDATE comuna SET ubicacion = POINT(-70.9333333, -30.6833333) WHERE id = 40203;
+UPDATE comuna SET ubicacion = POINT(-71.2666667, -30.9000000) WHERE id = 40204;
+UPDATE comuna SET ubicacion = POINT(-71.0500000, -31.1666667) WHERE id = 40205;
+UPDATE comuna SET ubicacion = POINT(-71.4447092, -31.5882085) WHERE id = 40301;
+UPDATE comuna SET ubicacion = POINT(-71.1500000, -31.6166667) WHERE id = 40302;
+UPDATE comuna SET ubicacion = POINT(-70.9666667, -31.7666667) WHERE id = 40303;
+UPDATE comuna SET ubicacion = POINT(-71.5166667, -31.9000000) WHERE id = 40304;
+UPDATE comuna SET ubicacion = POINT(-70.9333333, -32.2500000) WHERE id = 50101;
+UPDATE comuna SET ubicacion = POINT(-71.1333333, -32.4166667) WHERE id = 50102;
+UPDATE comuna SET ubicacion = POINT(-71.4500000, -32.5166667) WHERE id = 50103;
+UPDATE comuna SET ubicacion = POINT(-71.2166667, -32.4500000) WHERE id = 50104;
+UPDATE comuna SET ubicacion = POINT(-71.4666667, -32.5333333) WHERE id = 50105;
+UPDATE comuna SET ubicacion = POINT(-70.7333333, -32.6333333) WHERE id = 50201;
+UPDATE comuna SET ubicacion = POINT(-70.6666667, -32.7500000) WHERE id = 50202;
+UPDATE comuna SET ubicacion = POINT(-70.7333333, -32.7500000) WHERE id = 50203;
+UPDATE comuna SET ubicacion = POINT(-71.8166667, -35.4000000) WHERE id = 50204;
+UPDATE comuna SET ubicacion = POINT(-71.0333333, -32.6333333) WHERE id = 50205;
+UPDATE comuna SET ubicacion = POINT(-70.9666667, -32.8500000) WHERE id = 50206;
+UPDATE comuna SET ubicacion = POINT(-71.2333333, -32.7166667) WHERE id = 50301;
+UPDATE comuna SET ubicacion = POINT(-71.2166667, -32.7833333) WHERE id = 50302;
+UPDATE comuna SET ubicacion = POINT(-71.1666667, -32.8000000) WHERE id = 50303;
+UPDATE comuna SET ubicacion = POINT(-71.2333333, -32.8166667) WHERE id = 50304;
+UPDATE comuna SET ubicacion = POINT(-71.2666667, -32.8833333) WHERE id = 50305;
+UPDATE comuna SET ubicacion = POINT(-71.2000000, -33.0000000) WHERE id = 50306;
+UPDATE comuna SET ubicacion = POINT(-71.2833333, -32.9833333) WHERE id = 50307;
+UPDATE comuna SET ubicacion = POINT(-70.6166667, -32.8166667) WHERE id = 50401;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -32.8333333) WHERE id = 50402;
+UPDATE comuna SET ubicacion = POINT(-70.6333333, -32.8500000) WHERE id = 50403;
+UPDATE comuna SET ubicacion = POINT(-70.5833333, -32.8000000) WHERE id = 50404;
+UPDATE comuna SET ubicacion = POINT(-71.4166667, -32.7333333) WHERE id = 50501;
+UPDATE comuna SET ubicacion = POINT(-71.5333333, -32.7833333) WHERE id = 50502;
+UPDATE comuna SET ubicacion = POINT(-71.5333333, -33.0333333) WHERE id = 50503;
+UPDATE comuna SET ubicacion = POINT(-71.3666667, -33.0500000) WHERE id = 50504;
+UPDATE comuna SET ubicacion = POINT(-71.4500000, -33.0500000) WHERE id = 50505;
+UPDATE comuna SET ubicacion = POINT(-71.6163889, -33.0458333) WHERE id = 50506;
+UPDATE comuna SET ubicacion = POINT(-78.8666667, -33.6166667) WHERE id = 50507;
+UPDATE comuna SET ubicacion = POINT(-71.4166667, -33.3166667) WHERE id = 50508;
+UPDATE comuna SET ubicacion = POINT(-71.5166667, -32.9166667) WHERE id = 50509;
+UPDATE comuna SET ubicacion = POINT(-109.3750000, -27.0833333) WHERE id = 50601;
+UPDATE comuna SET ubicacion = POINT(-71.6927778, -33.3911111) WHERE id = 50701;
+UPDATE comuna SET ubicacion = POINT(-71.7000000, -33.4000000) WHERE id = 50702;
+UPDATE comuna SET ubicacion = POINT(-71.6666667, -33.4500000) WHERE id = 50703;
+UPDATE comuna SET ubicacion = POINT(-71.6000000, -33.5500000) WHERE id = 50704;
+UPDATE comuna SET ubicacion = POINT(-71.6166667, -33.6000000) WHERE id = 50705;
+UPDATE comuna SET ubicacion = POINT(-71.6500000, -33.6333333) WHERE id = 50706;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -33.9833333) WHERE id = 60101;
+UPDATE comuna SET ubicacion = POINT(-70.6666667, -34.0333333) WHERE id = 60102;
+UPDATE comuna SET ubicacion = POINT(-70.7266667, -34.0647222) WHERE id = 60103;
+UPDATE comuna SET ubicacion = POINT(-70.6511111, -34.1825000) WHERE id = 60104;
+UPDATE comuna SET ubicacion = POINT(-70.7397222, -34.1652778) WHERE id = 60105;
+UPDATE comuna SET ubicacion = POINT(-70.8175000, -34.2100000) WHERE id = 60106;
+UPDATE comuna SET ubicacion = POINT(-70.9666667, -34.2333333) WHERE id = 60107;
+UPDATE comuna SET ubicacion = POINT(-70.8333333, -34.2833333) WHERE id = 60108;
+UPDATE comuna SET ubicacion = POINT(-70.9666667, -34.2666667) WHERE id = 60109;
+UPDATE comuna SET ubicacion = POINT(-71.0857230, 34.2872290) WHERE id = 60110;
+UPDATE comuna SET ubicacion = POINT(-70.9833333, -34.3500000) WHERE id = 60111;
+UPDATE comuna SET ubicacion = POINT(-71.3166667, -34.3000000) WHERE id = 60112;
+UPDATE comuna SET ubicacion = POINT(-70.8666667, -34.4166667) WHERE id = 60113;
+UPDATE comuna SET ubicacion = POINT(-71.1666667, -34.4000000) WHERE id = 60114;
+UPDATE comuna SET ubicacion = POINT(-71.3000000, -34.3500000) WHERE id = 60115;
+UPDATE comuna SET ubicacion = POINT(-70.9500000, -34.4500000) WHERE id = 60116;
+UPDATE comuna SET ubicacion = POINT(-71.1333333, -34.5000000) WHERE id = 60117;
+UPDATE comuna SET ubicacion = POINT(-71.8333333, -33.9333333) WHERE id = 60201;
+UPDATE comuna SET ubicacion = POINT(-71.6666667, -34.2000000) WHERE id = 60202;
+UPDATE comuna SET ubicacion = POINT(-71.6333333, -34.4000000) WHERE id = 60203;
+UPDATE comuna SET ubicacion = POINT(-72.0000000, -34.3833333) WHERE id = 60204;
+UPDATE comuna SET ubicacion = POINT(-71.7333333, -34.1166667) WHERE id = 60205;
+UPDATE comuna SET ubicacion = POINT(-71.1666667, -34.7833333) WHERE id = 60206;
+UPDATE comuna SET ubicacion = POINT(-70.9666667, -34.5833333) WHERE id = 60301;
+UPDATE comuna SET ubicacion = POINT(-71.4833333, -34.4833333) WHERE id = 60302;
+UPDATE comuna SET ubicacion = POINT(-71.1166667, -34.6333333) WHERE id = 60303;
+UPDATE comuna SET ubicacion = POINT(-71.0500000, -34.7000000) WHERE id = 60304;
+UPDATE comuna SET ubicacion = POINT(-71.3666667, -34.6000000) WHERE id = 60305;
+UPDATE comuna SET ubicacion = POINT(-71.2166667, -34.6666667) WHERE id = 60306;
+UPDATE comuna SET ubicacion = POINT(-71.3666667, -34.6333333) WHERE id = 60307;
+UPDATE comuna SET ubicacion = POINT(-71.6666667, -34.6000000) WHERE id = 60308;
+UPDATE comuna SET ubicacion = POINT(-71.2833333, -34.7333333) WHERE id = 60309;
+UPDATE comuna SET ubicacion = POINT(-71.6447222, -34.7286111) WHERE id = 60310;
+UPDATE comuna SET ubicacion = POINT(-71.1833333, -34.8666667) WHERE id = 70101;
+UPDATE comuna SET ubicacion = POINT(-71.1333333, -34.9666667) WHERE id = 70102;
+UPDATE comuna SET ubicacion = POINT(-71.3166667, -34.9333333) WHERE id = 70103;
+UPDATE comuna SET ubicacion = POINT(-71.2333333, -34.9833333) WHERE id = 70104;
+UPDATE comuna SET ubicacion = POINT(-71.3833333, -35.0000000) WHERE id = 70105;
+UPDATE comuna SET ubicacion = POINT(-71.8047222, -34.9766667) WHERE id = 70106;
+UPDATE comuna SET ubicacion = POINT(-72.0000000, -34.8833333) WHERE id = 70107;
+UPDATE comuna SET ubicacion = POINT(-71.2833333, -34.1166667) WHERE id = 70108;
+UPDATE comuna SET ubicacion = POINT(-72.0000000, -34.9833333) WHERE id = 70109;
+UPDATE comuna SET ubicacion = POINT(-71.2666667, -35.2833333) WHERE id = 70201;
+UPDATE comuna SET ubicacion = POINT(-72.0166667, -35.0833333) WHERE id = 70202;
+UPDATE comuna SET ubicacion = POINT(-71.4500000, -35.3833333) WHERE id = 70203;
+UPDATE comuna SET ubicacion = POINT(-71.6666667, -35.4333333) WHERE id = 70204;
+UPDATE comuna SET ubicacion = POINT(-71.8166667, -35.4000000) WHERE id = 70205;
+UPDATE comuna SET ubicacion = POINT(-71.4833333, -35.5500000) WHERE id = 70206;
+UPDATE comuna SET ubicacion = POINT(-72.4166667, -35.3333333) WHERE id = 70207;
+UPDATE comuna SET ubicacion = POINT(-71.7000000, -35.5333333) WHERE id = 70208;
+UPDATE comuna SET ubicacion = POINT(-72.2833333, -35.6000000) WHERE id = 70209;
+UPDATE comuna SET ubicacion = POINT(-71.5333333, -35.3166667) WHERE id = 70210;
+UPDATE comuna SET ubicacion = POINT(-71.7500000, -35.6000000) WHERE id = 70301;
+UPDATE comuna SET ubicacion = POINT(-71.4166667, -35.7000000) WHERE id = 70302;
+UPDATE comuna SET ubicacion = POINT(-71.7500000, -35.6666667) WHERE id = 70303;
+UPDATE comuna SET ubicacion = POINT(-71.5833333, -35.7500000) WHERE id = 70304;
+UPDATE comuna SET ubicacion = POINT(-71.6000000, -35.8500000) WHERE id = 70305;
+UPDATE comuna SET ubicacion = POINT(-71.6833333, -35.9666667) WHERE id = 70306;
+UPDATE comuna SET ubicacion = POINT(-71.7666667, -36.0500000) WHERE id = 70307;
+UPDATE comuna SET ubicacion = POINT(-71.8333333, -36.1500000) WHERE id = 70308;
+UPDATE comuna SET ubicacion = POINT(-72.5333333, -35.7333333) WHERE id = 70401;
+UPDATE comuna SET ubicacion = POINT(-72.6333333, -35.8333333) WHERE id = 70402;
+UPDATE comuna SET ubicacion = POINT(-72.3500000, -35.9666667) WHERE id = 70403;
+UPDATE comuna SET ubicacion = POINT(-72.7833333, -36.1333333) WHERE id = 80101;
+UPDATE comuna SET ubicacion = POINT(-71.9000000, -36.3000000) WHERE id = 80102;
+UPDATE comuna SET ubicacion = POINT(-71.5500000, -36.5500000) WHERE id = 80103;
+UPDATE comuna SET ubicacion = POINT(-71.9580556, -36.4247222) WHERE id = 80104;
+UPDATE comuna SET ubicacion = POINT(-72.5333333, -36.2833333) WHERE id = 80105;
+UPDATE comuna SET ubicacion = POINT(-72.4000000, -36.4000000) WHERE id = 80106;
+UPDATE comuna SET ubicacion = POINT(-72.6666667, -36.4333333) WHERE id = 80107;
+UPDATE comuna SET ubicacion = POINT(-72.2166667, -36.5000000) WHERE id = 80108;
+UPDATE comuna SET ubicacion = POINT(-71.8333333, -36.6166667) WHERE id = 80109;
+UPDATE comuna SET ubicacion = POINT(-72.1166667, -36.6000000) WHERE id = 80110;
+UPDATE comuna SET ubicacion = POINT(-72.4333333, -36.5333333) WHERE id = 80111;
+UPDATE comuna SET ubicacion = POINT(-71.9000000, -36.7000000) WHERE id = 80112;
+UPDATE comuna SET ubicacion = POINT(-72.7000000, -36.4833333) WHERE id = 80113;
+UPDATE comuna SET ubicacion = POINT(-72.3014290, -36.7419870) WHERE id = 80114;
+UPDATE comuna SET ubicacion = POINT(-72.0333333, -36.8000000) WHERE id = 80115;
+UPDATE comuna SET ubicacion = POINT(-72.5500000, -36.6500000) WHERE id = 80116;
+UPDATE comuna SET ubicacion = POINT(-72.4666667, -36.7333333) WHERE id = 80117;
+UPDATE comuna SET ubicacion = POINT(-72.0323130, -36.8994440) WHERE id = 80118;
+UPDATE comuna SET ubicacion = POINT(-72.1000000, -36.9666667) WHERE id = 80119;
+UPDATE comuna SET ubicacion = POINT(-72.0166667, -37.1166667) WHERE id = 80120;
+UPDATE comuna SET ubicacion = POINT(-72.1333333, -36.6166667) WHERE id = 80121;
+UPDATE comuna SET ubicacion = POINT(-72.9500000, -36.6166667) WHERE id = 80201;
+UPDATE comuna SET ubicacion = POINT(-72.6666667, -36.8166667) WHERE id = 80202;
+UPDATE comuna SET ubicacion = POINT(-72.9833333, -36.7333333) WHERE id = 80203;
+UPDATE comuna SET ubicacion = POINT(-73.1166667, -36.7166667) WHERE id = 80204;
+UPDATE comuna SET ubicacion = POINT(-73.0500000, -36.8333333) WHERE id = 80205;
+UPDATE comuna SET ubicacion = POINT(-72.9333333, -36.9666667) WHERE id = 80206;
+UPDATE comuna SET ubicacion = POINT(-73.1333333, -37.0166667) WHERE id = 80207;
+UPDATE comuna SET ubicacion = POINT(-73.1560560, -37.0870730) WHERE id = 80208;
+UPDATE comuna SET ubicacion = POINT(-72.9333333, -37.1666667) WHERE id = 80209;
+UPDATE comuna SET ubicacion = POINT(-73.0166667, -36.9166667) WHERE id = 80210;
+UPDATE comuna SET ubicacion = POINT(-73.1166667, -36.8333333) WHERE id = 80211;
+UPDATE comuna SET ubicacion = POINT(-73.0833333, -36.7833333) WHERE id = 80212;
+UPDATE comuna SET ubicacion = POINT(-72.4000000, -37.0333333) WHERE id = 80301;
+UPDATE comuna SET ubicacion = POINT(-72.5333333, -37.1333333) WHERE id = 80302;
+UPDATE comuna SET ubicacion = POINT(-71.9500000, -37.2833333) WHERE id = 80303;
+UPDATE comuna SET ubicacion = POINT(-71.6833333, -37.3333333) WHERE id = 80304;
+UPDATE comuna SET ubicacion = POINT(-72.7166667, -37.2666667) WHERE id = 80305;
+UPDATE comuna SET ubicacion = POINT(-72.7000000, -37.2666667) WHERE id = 80306;
+UPDATE comuna SET ubicacion = POINT(-71.9666667, -37.4666667) WHERE id = 80307;
+UPDATE comuna SET ubicacion = POINT(-72.3500000, -37.4666667) WHERE id = 80308;
+UPDATE comuna SET ubicacion = POINT(-72.6666667, -37.5000000) WHERE id = 80309;
+UPDATE comuna SET ubicacion = POINT(-72.5166667, -37.5833333) WHERE id = 80310;
+UPDATE comuna SET ubicacion = POINT(-72.0166667, -37.6666667) WHERE id = 80311;
+UPDATE comuna SET ubicacion = POINT(-71.9833333, -37.6666667) WHERE id = 80312;
+UPDATE comuna SET ubicacion = POINT(-72.2333333, -37.7166667) WHERE id = 80313;
+UPDATE comuna SET ubicacion = POINT(-71.3166667, -38.0500000) WHERE id = 80314;
+UPDATE comuna SET ubicacion = POINT(-73.3166667, -37.2500000) WHERE id = 80401;
+UPDATE comuna SET ubicacion = POINT(-73.3500000, -37.4666667) WHERE id = 80402;
+UPDATE comuna SET ubicacion = POINT(-73.4666667, -37.6166667) WHERE id = 80403;
+UPDATE comuna SET ubicacion = POINT(-73.6500000, -37.6166667) WHERE id = 80404;
+UPDATE comuna SET ubicacion = POINT(-73.3833333, -37.8000000) WHERE id = 80405;
+UPDATE comuna SET ubicacion = POINT(-73.2333333, -38.0000000) WHERE id = 80406;
+UPDATE comuna SET ubicacion = POINT(-73.5000000, -38.3333333) WHERE id = 80407;
+UPDATE comuna SET ubicacion = POINT(-72.5833333, -37.6666667) WHERE id = 90101;
+UPDATE comuna SET ubicacion = POINT(-72.7166667, -37.8000000) WHERE id = 90102;
+UPDATE comuna SET ubicacion = POINT(-72.4333333, -37.9500000) WHERE id = 90103;
+UPDATE comuna SET ubicacion = POINT(-72.8333333, -37.9666667) WHERE id = 90104;
+UPDATE comuna SET ubicacion = POINT(-73.0833333, -38.0166667) WHERE id = 90105;
+UPDATE comuna SET ubicacion = POINT(-72.3833333, -38.0500000) WHERE id = 90106;
+UPDATE comuna SET ubicacion = POINT(-72.9166667, -38.1500000) WHERE id = 90107;
+UPDATE comuna SET ubicacion = POINT(-72.3333333, -38.2166667) WHERE id = 90108;
+UPDATE comuna SET ubicacion = POINT(-72.6833333, -38.2500000) WHERE id = 90109;
+UPDATE comuna SET ubicacion = POINT(-71.8833333, -38.4333333) WHERE id = 90110;
+UPDATE comuna SET ubicacion = POINT(-71.2333333, -38.4333333) WHERE id = 90111;
+UPDATE comuna SET ubicacion = POINT(-72.3833333, -38.4166667) WHERE id = 90201;
+UPDATE comuna SET ubicacion = POINT(-72.7833333, -38.4000000) WHERE id = 90202;
+UPDATE comuna SET ubicacion = POINT(-72.4350000, -38.5291667) WHERE id = 90203;
+UPDATE comuna SET ubicacion = POINT(-72.3794444, -39.1183333) WHERE id = 90204;
+UPDATE comuna SET ubicacion = POINT(-72.6666667, -38.7500000) WHERE id = 90205;
+UPDATE comuna SET ubicacion = POINT(-73.1666667, -38.7000000) WHERE id = 90206;
+UPDATE comuna SET ubicacion = POINT(-71.7000000, -38.8500000) WHERE id = 90207;
+UPDATE comuna SET ubicacion = POINT(-72.9500000, -38.7333333) WHERE id = 90208;
+UPDATE comuna SET ubicacion = POINT(-73.4000000, -38.7833333) WHERE id = 90209;
+UPDATE comuna SET ubicacion = POINT(-72.0333333, -38.9166667) WHERE id = 90210;
+UPDATE comuna SET ubicacion = POINT(-72.6333333, -38.9500000) WHERE id = 90211;
+UPDATE comuna SET ubicacion = POINT(-72.6500000, -38.9833333) WHERE id = 90212;
+UPDATE comuna SET ubicacion = POINT(-73.0500000, -38.9666667) WHERE id = 90213;
+UPDATE comuna SET ubicacion = POINT(-72.6833333, -39.1000000) WHERE id = 90214;
+UPDATE comuna SET ubicacion = POINT(-71.9666667, -39.2666667) WHERE id = 90215;
+UPDATE comuna SET ubicacion = POINT(-72.2166667, -39.2666667) WHERE id = 90216;
+UPDATE comuna SET ubicacion = POINT(-73.2333333, -39.2166667) WHERE id = 90217;
+UPDATE comuna SET ubicacion = POINT(-71.5833333, -39.3500000) WHERE id = 90218;
+UPDATE comuna SET ubicacion = POINT(-72.6333333, -39.3666667) WHERE id = 90219;
+UPDATE comuna SET ubicacion = POINT(-72.6000000, -38.7666667) WHERE id = 90220;
+UPDATE comuna SET ubicacion = POINT(-72.8500000, -38.6000000) WHERE id = 90221;
+UPDATE comuna SET ubicacion = POINT(-73.0166667, -40.4000000) WHERE id = 100201;
+UPDATE comuna SET ubicacion = POINT(-73.4000000, -40.5166667) WHERE id = 100202;
+UPDATE comuna SET ubicacion = POINT(-73.1500000, -40.5666667) WHERE id = 100203;
+UPDATE comuna SET ubicacion = POINT(-72.6166667, -40.6666667) WHERE id = 100204;
+UPDATE comuna SET ubicacion = POINT(-73.2333333, -40.7833333) WHERE id = 100205;
+UPDATE comuna SET ubicacion = POINT(-73.1666667, -40.9166667) WHERE id = 100206;
+UPDATE comuna SET ubicacion = POINT(-72.9000000, -40.9666667) WHERE id = 100207;
+UPDATE comuna SET ubicacion = POINT(-73.1000000, -41.1166667) WHERE id = 100301;
+UPDATE comuna SET ubicacion = POINT(-73.4500000, -41.1500000) WHERE id = 100302;
+UPDATE comuna SET ubicacion = POINT(-73.0166667, -41.2500000) WHERE id = 100303;
+UPDATE comuna SET ubicacion = POINT(-72.9833333, -41.3166667) WHERE id = 100304;
+UPDATE comuna SET ubicacion = POINT(-73.4833333, -41.4000000) WHERE id = 100305;
+UPDATE comuna SET ubicacion = POINT(-72.9333333, -41.4666667) WHERE id = 100306;
+UPDATE comuna SET ubicacion = POINT(-73.6000000, -41.6166667) WHERE id = 100307;
+UPDATE comuna SET ubicacion = POINT(-73.1333333, -41.7666667) WHERE id = 100308;
+UPDATE comuna SET ubicacion = POINT(-72.3166667, -41.5000000) WHERE id = 100309;
+UPDATE comuna SET ubicacion = POINT(-73.8333333, -41.8666667) WHERE id = 100401;
+UPDATE comuna SET ubicacion = POINT(-73.5166667, -42.1333333) WHERE id = 100402;
+UPDATE comuna SET ubicacion = POINT(-73.7000000, -42.3666667) WHERE id = 100403;
+UPDATE comuna SET ubicacion = POINT(-73.5833333, -42.4333333) WHERE id = 100404;
+UPDATE comuna SET ubicacion = POINT(-73.8000000, -42.4666667) WHERE id = 100405;
+UPDATE comuna SET ubicacion = POINT(-73.8166667, -42.6166667) WHERE id = 100406;
+UPDATE comuna SET ubicacion = POINT(-73.4666667, -42.8666667) WHERE id = 100407;
+UPDATE comuna SET ubicacion = POINT(-73.6000000, -43.1000000) WHERE id = 100408;
+UPDATE comuna SET ubicacion = POINT(-73.4166667, -42.5333333) WHERE id = 100409;
+UPDATE comuna SET ubicacion = POINT(-73.6333333, -42.5833333) WHERE id = 100410;
+UPDATE comuna SET ubicacion = POINT(-72.7088889, -42.9194444) WHERE id = 100501;
+UPDATE comuna SET ubicacion = POINT(-71.8500000, -43.1666667) WHERE id = 100502;
+UPDATE comuna SET ubicacion = POINT(-71.8000000, -43.6166667) WHERE id = 100503;
+UPDATE comuna SET ubicacion = POINT(-72.6833333, -42.0166667) WHERE id = 100504;
+UPDATE comuna SET ubicacion = POINT(-73.7333333, -43.8833333) WHERE id = 110101;
+UPDATE comuna SET ubicacion = POINT(-72.7000000, -44.7500000) WHERE id = 110102;
+UPDATE comuna SET ubicacion = POINT(-72.7000000, -45.4000000) WHERE id = 110103;
+UPDATE comuna SET ubicacion = POINT(-72.0666667, -45.5666667) WHERE id = 110201;
+UPDATE comuna SET ubicacion = POINT(-71.8333333, -44.2333333) WHERE id = 110202;
+UPDATE comuna SET ubicacion = POINT(-71.9333333, -46.3000000) WHERE id = 110301;
+UPDATE comuna SET ubicacion = POINT(-71.7333333, -46.5500000) WHERE id = 110302;
+UPDATE comuna SET ubicacion = POINT(-72.5500000, -47.2666667) WHERE id = 110401;
+UPDATE comuna SET ubicacion = POINT(-73.5666667, -47.8333333) WHERE id = 110402;
+UPDATE comuna SET ubicacion = POINT(-72.5666667, -48.4666667) WHERE id = 110403;
+UPDATE comuna SET ubicacion = POINT(-72.3500000, -51.2666667) WHERE id = 120101;
+UPDATE comuna SET ubicacion = POINT(-72.5166667, -51.7333333) WHERE id = 120102;
+UPDATE comuna SET ubicacion = POINT(-71.9166667, -52.2500000) WHERE id = 120201;
+UPDATE comuna SET ubicacion = POINT(-69.6833333, -52.3166667) WHERE id = 120202;
+UPDATE comuna SET ubicacion = POINT(-71.4833333, -52.6500000) WHERE id = 120203;
+UPDATE comuna SET ubicacion = POINT(-70.9336111, -53.1669444) WHERE id = 120204;
+UPDATE comuna SET ubicacion = POINT(-70.3666667, -53.3000000) WHERE id = 120301;
+UPDATE comuna SET ubicacion = POINT(-69.2500000, -52.7166667) WHERE id = 120302;
+UPDATE comuna SET ubicacion = POINT(-69.9000000, -53.6666667) WHERE id = 120303;
+UPDATE comuna SET ubicacion = POINT(-71.5000000, -75.0000000) WHERE id = 120401;
+UPDATE comuna SET ubicacion = POINT(-70.9333333, -33.0833333) WHERE id = 130101;
+UPDATE comuna SET ubicacion = POINT(-70.6833333, -33.2000000) WHERE id = 130102;
+UPDATE comuna SET ubicacion = POINT(-70.9000000, -33.2833333) WHERE id = 130103;
+UPDATE comuna SET ubicacion = POINT(-70.6166667, -33.3500000) WHERE id = 130201;
+UPDATE comuna SET ubicacion = POINT(-70.7500000, -33.3666667) WHERE id = 130202;
+UPDATE comuna SET ubicacion = POINT(-70.7333333, -33.4000000) WHERE id = 130203;
+UPDATE comuna SET ubicacion = POINT(-70.5833333, -33.4166667) WHERE id = 130204;
+UPDATE comuna SET ubicacion = POINT(-70.7166667, -33.4333333) WHERE id = 130205;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -33.4500000) WHERE id = 130206;
+UPDATE comuna SET ubicacion = POINT(-70.6166667, -33.4333333) WHERE id = 130207;
+UPDATE comuna SET ubicacion = POINT(-70.6666667, -33.4500000) WHERE id = 130208;
+UPDATE comuna SET ubicacion = POINT(-70.5500000, -33.4500000) WHERE id = 130209;
+UPDATE comuna SET ubicacion = POINT(-70.6000000, -33.4666667) WHERE id = 130210;
+UPDATE comuna SET ubicacion = POINT(-70.6666667, -33.5000000) WHERE id = 130211;
+UPDATE comuna SET ubicacion = POINT(-70.7666667, -33.5166667) WHERE id = 130212;
+UPDATE comuna SET ubicacion = POINT(-70.6833333, -33.5500000) WHERE id = 130213;
+UPDATE comuna SET ubicacion = POINT(-70.5666667, -33.5500000) WHERE id = 130214;
+UPDATE comuna SET ubicacion = POINT(-70.5833333, -33.5833333) WHERE id = 130215;
+UPDATE comuna SET ubicacion = POINT(-70.6549320, -33.4219880) WHERE id = 130216;
+UPDATE comuna SET ubicacion = POINT(-70.6666667, -33.3500000) WHERE id = 130217;
+UPDATE comuna SET ubicacion = POINT(-33.4081480, -70.6391920) WHERE id = 130218;
+UPDATE comuna SET ubicacion = POINT(-70.6000000, -33.4000000) WHERE id = 130219;
+UPDATE comuna SET ubicacion = POINT(-70.5166667, -33.3500000) WHERE id = 130220;
+UPDATE comuna SET ubicacion = POINT(-70.5666667, -33.5000000) WHERE id = 130221;
+UPDATE comuna SET ubicacion = POINT(-70.5333333, -33.4833333) WHERE id = 130222;
+UPDATE comuna SET ubicacion = POINT(-70.6166667, -33.5000000) WHERE id = 130223;
+UPDATE comuna SET ubicacion = POINT(-70.6166667, -33.5833333) WHERE id = 130224;
+UPDATE comuna SET ubicacion = POINT(-70.5000000, -33.4500000) WHERE id = 130225;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -33.5666667) WHERE id = 130226;
+UPDATE comuna SET ubicacion = POINT(-70.6780860, -33.4924550) WHERE id = 130227;
+UPDATE comuna SET ubicacion = POINT(-70.7166667, -33.5333333) WHERE id = 130228;
+UPDATE comuna SET ubicacion = POINT(-70.7029760, -33.4633150) WHERE id = 130229;
+UPDATE comuna SET ubicacion = POINT(-70.7000000, -33.4833333) WHERE id = 130230;
+UPDATE comuna SET ubicacion = POINT(-70.7166667, -33.4333333) WHERE id = 130231;
+UPDATE comuna SET ubicacion = POINT(-70.7166667, -33.4166667) WHERE id = 130232;
+UPDATE comuna SET ubicacion = POINT(-70.3666667, -33.6333333) WHERE id = 130301;
+UPDATE comuna SET ubicacion = POINT(-70.5833333, -33.6166667) WHERE id = 130302;
+UPDATE comuna SET ubicacion = POINT(-70.5500000, -33.6333333) WHERE id = 130303;
+UPDATE comuna SET ubicacion = POINT(-70.7166667, -33.6000000) WHERE id = 130401;
+UPDATE comuna SET ubicacion = POINT(-70.8166667, -33.6500000) WHERE id = 130402;
+UPDATE comuna SET ubicacion = POINT(-70.7500000, -33.7333333) WHERE id = 130403;
+UPDATE comuna SET ubicacion = POINT(-70.7500000, -33.8166667) WHERE id = 130404;
+UPDATE comuna SET ubicacion = POINT(-70.9166667, -33.6166667) WHERE id = 130501;
+UPDATE comuna SET ubicacion = POINT(-70.9333333, -33.6666667) WHERE id = 130502;
+UPDATE comuna SET ubicacion = POINT(-71.0166667, -33.6833333) WHERE id = 130503;
+UPDATE comuna SET ubicacion = POINT(-70.9000000, -33.7500000) WHERE id = 130504;
+UPDATE comuna SET ubicacion = POINT(-71.1500000, -33.4000000) WHERE id = 130601;
+UPDATE comuna SET ubicacion = POINT(-71.1333333, -33.5333333) WHERE id = 130602;
+UPDATE comuna SET ubicacion = POINT(-71.2166667, -33.7000000) WHERE id = 130603;
+UPDATE comuna SET ubicacion = POINT(-71.4666667, -33.9000000) WHERE id = 130604;
+UPDATE comuna SET ubicacion = POINT(-71.0997538, -34.0264087) WHERE id = 130605;
+UPDATE comuna SET ubicacion = POINT(-70.8333333, -33.5666667) WHERE id = 130606;
+UPDATE comuna SET ubicacion = POINT(-72.7666667, -39.4333333) WHERE id = 100101;
+UPDATE comuna SET ubicacion = POINT(-72.9666667, -39.5166667) WHERE id = 100102;
+UPDATE comuna SET ubicacion = POINT(-72.3333333, -39.6333333) WHERE id = 100103;
+UPDATE comuna SET ubicacion = POINT(-72.9500000, -39.6500000) WHERE id = 100104;
+UPDATE comuna SET ubicacion = POINT(-73.2333333, -39.8000000) WHERE id = 100105;
+UPDATE comuna SET ubicacion = POINT(-72.8333333, -39.8500000) WHERE id = 100106;
+UPDATE comuna SET ubicacion = POINT(-73.4333333, -39.8666667) WHERE id = 100107;
+UPDATE comuna SET ubicacion = POINT(-72.8833333, -40.0666667) WHERE id = 100108;
+UPDATE comuna SET ubicacion = POINT(-72.4000000, -40.1333333) WHERE id = 100109;
+UPDATE comuna SET ubicacion = POINT(-72.5000000, -40.3166667) WHERE id = 100110;
+UPDATE comuna SET ubicacion = POINT(-73.0833333, -40.2833333) WHERE id = 100111;
+UPDATE comuna SET ubicacion = POINT(-72.9666667, -40.3166667) WHERE id = 100112;
+UPDATE comuna SET ubicacion = POINT(-69.5000000, -17.5666667) WHERE id = 10101;
+UPDATE comuna SET ubicacion = POINT(-69.5977778, -18.1916667) WHERE id = 10102;
+UPDATE comuna SET ubicacion = POINT(-70.3144444, -18.4750000) WHERE id = 10201;
+UPDATE comuna SET ubicacion = POINT(-69.8666667, -19.0166667) WHERE id = 10202;
+
+ALTER TABLE comuna
+  MODIFY COLUMN `ubicacion` POINT NOT NULL SRID 0,
+  ADD SPATIAL INDEX `comuna_ubicacion_idx` (`ubicacion`);
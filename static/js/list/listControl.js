@@ -1,4 +1,4 @@
-import {capitalizeString, getEventById, getEvents, queryId} from "../utils.js"
+import {capitalizeString, getEventById, getEvents, imagePath, queryId} from "../utils.js"
 
 /**
  * Page base URL to construct absolute paths.
@@ -64,10 +64,13 @@ const handleURLParams = async () => {
  */
 const controlEventTable = async () => {
   let currentEvents
-  const {count: eventCount, data: events} = await getEvents(eventsPerPage, 0)  // fetch events
+  const {count: eventCount, data: events, next} = await getEvents(eventsPerPage, 0)  // fetch events
   console.log({eventCount, events})
   currentEvents = events
 
+  // cursor of every page reached so far, pages without one are fetched by offset
+  let pageCursors = {1: next}
+
   const pageCount = Math.ceil(eventCount / eventsPerPage)  // number of page for table
   for (let pageNumber = 0; pageNumber < pageCount; pageNumber++) {
     pagination.innerHTML += `
@@ -94,11 +97,12 @@ const controlEventTable = async () => {
     if (selectedPage === currentPage) return
 
     // if selected page is different from current, fetch data
-    getEvents(eventsPerPage, eventsPerPage * selectedPage)
+    getEvents(eventsPerPage, eventsPerPage * selectedPage, pageCursors[selectedPage], false)
         .then(
             response => {
-              const {count: eventCount, data: events} = response
-              console.log({eventCount, events})
+              const {data: events, next} = response
+              console.log({events})
+              pageCursors[selectedPage + 1] = next
               currentEvents = events
               showPage(currentEvents)
               currentPage = selectedPage
@@ -190,10 +194,7 @@ const showEventModal = (eventData) => {
   let imagesList = ''
   images.forEach(
       (image) => {
-        const
-            imageBasePath = image['basepath'],
-            imageFileName = image['image-path']
-        const imageFullPath = `${baseURL}/${imageBasePath}/${imageFileName}`
+        const imageFullPath = `${baseURL}/${imagePath(image, 960)}`
 
         imagesList += `
           <img src="${imageFullPath}" class="my-3 img-fluid event-list-img inside-modal" alt="foto de evento">
@@ -262,10 +263,7 @@ const showPage = (events) => {
             images = eventData['foto-comida'],
             name = eventData['nombre']
 
-        const
-            imageBasePath = images[0]['basepath'],
-            imageFileName = images[0]['image-path']
-        const imageFullPath = `${baseURL}/${imageBasePath}/${imageFileName}`
+        const imageFullPath = `${baseURL}/${imagePath(images[0], 160)}`  // first image as a thumbnail
 
         tableContent += `
           <tr class="align-middle" id="row-${idx}">
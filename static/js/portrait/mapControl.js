@@ -1,4 +1,4 @@
-import {getComunasXY, getEventsOfComuna, getImageCountPerComuna, queryId, stringAreSimilar} from "../utils.js"
+import {debounce, getEventsSummary, imagePath, queryId} from "../utils.js"
 
 /**
  * Page base URL to construct absolute paths.
@@ -19,47 +19,60 @@ const eventPageURL = `${baseURL}/templates/eventList.html`
 let mapDiv = queryId('map')
 mapDiv.style.height = '400px'  // set mapDiv height in order to be displayed
 
+/**
+ * Latest events shown in popup of every marker.
+ * @type {number}
+ */
+const eventsPerMarker = 3
+
 
 /**
- *
+ * Create map and load markers of comunas in view, again every time view changes.
+ * <br>
  * @return {Promise<void>}
  */
 const mapControl = async () => {
-  const [comunasCoordinates, imagesPerComuna] = await Promise.all([getComunasXY(), getImageCountPerComuna()])
-  console.log({imagesPerComuna})
-
   let map = createMap(mapDiv)
-  let markers = createMarkers(map, comunasCoordinates, imagesPerComuna)
+  let markersLayer = L.layerGroup().addTo(map)  // markers of current view, replaced when view changes
+
+  const loadView = async () => {
+    const summary = await getEventsSummary(map.getBounds(), eventsPerMarker)  // every marker in one request
+    createMarkers(markersLayer, summary)
+  }
 
-  console.log({markers})
+  map.on('moveend', debounce(loadView, 300))
+  await loadView()
 }
 
 
 /**
  * Create and add markers to map.
  * <br>
- * For every comuna where at least one event has been reported, a marker is created and added
- * with a title reporting comuna name and total number of images for all comuna events.
+ * For every comuna in view where at least one event has been reported, a marker is created and added
+ * with a title reporting comuna name and total number of images for all comuna events. Markers keep
+ * latest events of their comuna, so opening them requires no request.
  * <br>
- * @param map - Leaflet map where markers will be added.
- * @param comunasCoordinates{Array<Object>} - Array of coordinates for Chile's comunas.
- * @param imagesPerComuna{Array<Array<string, number>>} - Array of tuple with comuna and number of images.
+ * @param markersLayer - Leaflet layer group where markers are added, cleared beforehand.
+ * @param summary{Object} - Comunas in view with coordinates, counts and latest events.
  * @return {*[]} - List of markers created per comuna.
  */
-const createMarkers = (map, comunasCoordinates, imagesPerComuna) => {
+const createMarkers = (markersLayer, summary) => {
+  markersLayer.clearLayers()
+
   let markers = []  // markers array
-  imagesPerComuna.forEach(
-      ([comunaName, imageCount]) => {
-        const {lng, lat} = comunasCoordinates.find(comunaXY => stringAreSimilar(comunaName, comunaXY.name))
-        const imageWord = (imageCount > 1) ? 'imágenes' : 'imagen'
+  summary.comunas.forEach(
+      ({comuna: comunaName, lat, lng, count, images: imageCount, events}) => {
+        const imageWord = (imageCount === 1) ? 'imagen' : 'imágenes'
         const markerTitle = `${comunaName}: ${imageCount} ${imageWord}`
 
         markers.push(  // save markers
             L.marker([lat, lng], {
               title: markerTitle,
               riseOnHover: true,
-              comuna: comunaName
-            }).addTo(map).on('click', handleMarkerClick)
+              comuna: comunaName,
+              count: count,
+              events: events
+            }).addTo(markersLayer).on('click', handleMarkerClick)
         )
       }
   )
@@ -73,12 +86,11 @@ const createMarkers = (map, comunasCoordinates, imagesPerComuna) => {
  * <br>
  * @param e{Event} - Event that triggered handler.
  */
-const handleMarkerClick = async (e) => {
+const handleMarkerClick = (e) => {
   let marker = e.target  // marker object that triggered event
-  const markerComuna = marker.options.comuna  // comuna represented by marker
+  const {events, count} = marker.options  // latest events of comuna represented by marker, and their total
 
-  const {data: events} = await getEventsOfComuna(markerComuna)  // fetch events data from comuna
-  const popUpInnerHTML = constructPopOpInnerHTML(events)  // construct popup innerhtml
+  const popUpInnerHTML = constructPopOpInnerHTML(events, count)  // construct popup innerhtml
 
   // construct popup, bind it to marker and open it
   marker.bindPopup(popUpInnerHTML, {
@@ -92,10 +104,11 @@ const handleMarkerClick = async (e) => {
 /**
  * Construct PopUp innerHTML from an array of events data.
  * <br>
- * @param eventsData{Array<Object>} - data of events in a given comuna.
+ * @param eventsData{Array<Object>} - data of latest events in a given comuna.
+ * @param count{Number} - total number of events in comuna.
  * @return {string} - innerHTML to be added as a PopUp content.
  */
-const constructPopOpInnerHTML = (eventsData) => {
+const constructPopOpInnerHTML = (eventsData, count) => {
   let popUpInnerHTML = ''
   eventsData.forEach(
       (event, idx) => {
@@ -116,10 +129,7 @@ const constructPopOpInnerHTML = (eventsData) => {
 
         images.forEach(  // every image from event is displayed with maximum width fixed
             (image) => {
-              const
-                  imageBasePath = image['basepath'],
-                  imageFileName = image['image-path']
-              const imageFullPath = `${baseURL}/${imageBasePath}/${imageFileName}`
+              const imageFullPath = `${baseURL}/${imagePath(image, 480)}`
 
               popUpInnerHTML += `
                 <img src="${imageFullPath}" class="img-fluid" alt="foto de evento">
@@ -142,6 +152,12 @@ const constructPopOpInnerHTML = (eventsData) => {
       }
   )
 
+  if (count > eventsData.length) {  // only latest events are shown
+    popUpInnerHTML += `
+      <p class="m-3 text-muted">Y ${count - eventsData.length} eventos anteriores.</p>
+    `
+  }
+
   return popUpInnerHTML
 }
 
@@ -1,4 +1,4 @@
-import {getLastEvents, queryId} from "../utils.js"
+import {getLastEvents, imagePath, queryId} from "../utils.js"
 
 /**
  * Page base URL to construct absolute paths.
@@ -20,8 +20,8 @@ let tableBody = queryId('table-body')
  */
 const showPortrait = async () => {
   const  // fetch last five events reported
-      {count: eventCount, data: lastEvents} = await getLastEvents(5)
-  console.log({eventCount, lastEvents})
+      {data: lastEvents} = await getLastEvents(5)
+  console.log({lastEvents})
 
   lastEvents.forEach(  //  display each event inside a table
       (eventData) => addEventToTable(eventData)
@@ -46,12 +46,7 @@ const addEventToTable = (eventData) => {
     'foto-comida': images
   } = eventData
 
-  const {  // destructure first image data
-    'basepath': imageBasePath,
-    'image-path': imageFileName
-  } = images[0]
-
-  const imageFullPath = `${baseURL}/${imageBasePath}/${imageFileName}`  // first image full path
+  const imageFullPath = `${baseURL}/${imagePath(images[0], 160)}`  // first image full path, as a thumbnail
 
   // add row to table html element
   tableBody.innerHTML += `  
@@ -104,6 +104,24 @@ export const getRegionsAndComunas = async () => {
 }
 
 
+/**
+ * Path of an event image to be displayed at a given width. Smallest variant
+ * at least as wide is chosen, original image is used if there is none.
+ * <br>
+ * @param image{Object} - Image data, as returned in 'foto-comida' of an event.
+ * @param width{Number} - Width in pixels image will be displayed at.
+ * @param format{string} - Preferred variant format.
+ * @return {string} - Path of image relative to page base URL.
+ */
+export const imagePath = (image, width, format = 'webp') => {
+  const variant = (image['variants'] || [])  // variants are sorted by width
+      .find((variant) => variant['format'] === format && variant['width'] >= width)
+  const {'basepath': basePath, 'image-path': fileName} = variant || image
+
+  return `${basePath}/${fileName}`
+}
+
+
 /**
  * Async function to fetch food types from JSON file.
  * <br>
@@ -261,23 +279,30 @@ export const stringAreSimilar = (str1, str2) => {
 export const getLastEvents = async (limit) => {
   const params = {
     type: 'events',
-    limit: limit.toString()
+    limit: limit.toString(),
+    count: 'false'
   }
 
   return await fetchDataAPI(params)
 }
 
 /**
- * Async function to fetch food types from JSON file.
+ * Async function to fetch a page of events, either by offset or by cursor.
  * <br>
- * @returns {Promise<*[]>} - Array of food types as a Promise.
+ * @param limit{Number} - Number of events to retrieve.
+ * @param offset{Number} - Number of events to skip, ignored if after is given.
+ * @param after{string} - Cursor returned as next by a previous page.
+ * @param withCount{boolean} - Whether total number of events is required.
+ * @returns {Promise<*>} - Event count, events data and cursor of next page as a Promise.
  */
-export const getEvents = async (limit, offset) => {
+export const getEvents = async (limit, offset, after, withCount = true) => {
   const params = {
     type: 'events'
   }
   if (limit) params.limit = limit
-  if (offset) params.offset = offset
+  if (after) params.after = after
+  else if (offset) params.offset = offset
+  if (!withCount) params.count = 'false'
 
   return await fetchDataAPI(params)
 }
@@ -326,6 +351,24 @@ export const getEventsOfComuna = async (comuna) => {
 }
 
 
+/**
+ * Get summary of every comuna in a map view: event and image count, and its latest events.
+ * <br>
+ * @param bounds{Object} - Leaflet LatLngBounds of view.
+ * @param perComuna{Number} - Number of latest events of every comuna.
+ * @return {Promise<*>} - Summaries per comuna with its coordinates, counts per region and total count.
+ */
+export const getEventsSummary = async (bounds, perComuna) => {
+  const params = {
+    type: 'events-summary',
+    bbox: [bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast()].join(',')
+  }
+  if (perComuna) params['per-comuna'] = perComuna
+
+  return await fetchDataAPI(params)
+}
+
+
 /**
  * Get event data specified by an ID.
  * <br>
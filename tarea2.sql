@@ -31,6 +31,7 @@ CREATE TABLE IF NOT EXISTS `tarea2`.`comuna` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `nombre` VARCHAR(200) NOT NULL,
   `region_id` INT NOT NULL,
+  `ubicacion` POINT NULL SRID 0,  -- longitude and latitude, set by comuna-ubicacion.sql along with its spatial index
   PRIMARY KEY (`id`),
   INDEX `fk_comuna_region1_idx` (`region_id` ASC),
   CONSTRAINT `fk_comuna_region1`
@@ -56,7 +57,9 @@ CREATE TABLE IF NOT EXISTS `tarea2`.`evento` (
   `descripcion` VARCHAR(500) NULL,
   `tipo` ENUM('Al Paso', 'Alemana', 'Árabe', 'Argentina', 'Asiática', 'Australiana', 'Brasileña', 'Café y Snacks', 'Carnes', 'Casera', 'Chilena', 'China', 'Cocina de Autor', 'Comida Rápida', 'Completos', 'Coreana', 'Cubana', 'Española', 'Exótica', 'Francesa', 'Gringa', 'Hamburguesa', 'Helados', 'India', 'Internacional', 'Italiana', 'Latinoamericana', 'Mediterránea', 'Mexicana', 'Nikkei', 'Parrillada', 'Peruana', 'Pescados y mariscos', 'Picoteos', 'Pizzas', 'Pollos y Pavos', 'Saludable', 'Sándwiches', 'Suiza', 'Japonesa', 'Sushi', 'Tapas', 'Thai', 'Vegana', 'Vegetariana') NOT NULL,
   PRIMARY KEY (`id`),
-  INDEX `fk_evento_comuna1_idx` (`comuna_id` ASC),
+  INDEX `fk_evento_comuna1_idx` (`comuna_id` ASC, `dia_hora_inicio` DESC, `id` DESC),
+  INDEX `evento_inicio_id_idx` (`dia_hora_inicio` DESC, `id` DESC),
+  FULLTEXT INDEX `evento_busqueda_idx` (`nombre`, `descripcion`, `sector`),
   CONSTRAINT `fk_evento_comuna1`
     FOREIGN KEY (`comuna_id`)
     REFERENCES `tarea2`.`comuna` (`id`)
@@ -75,6 +78,7 @@ CREATE TABLE IF NOT EXISTS `tarea2`.`foto` (
   `evento_id` INT NOT NULL,
   PRIMARY KEY (`id`, `evento_id`),
   INDEX `fk_foto_evento1_idx` (`evento_id` ASC),
+  INDEX `foto_archivo_idx` (`ruta_archivo` ASC, `nombre_archivo` ASC),
   CONSTRAINT `fk_foto_evento1`
     FOREIGN KEY (`evento_id`)
     REFERENCES `tarea2`.`evento` (`id`)
@@ -101,6 +105,96 @@ CREATE TABLE IF NOT EXISTS `tarea2`.`red_social` (
 ENGINE = InnoDB;
 
 
+-- -----------------------------------------------------
+-- Table `tarea2`.`foto_variante`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`foto_variante` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `ruta_archivo` VARCHAR(300) NOT NULL,
+  `nombre_archivo` VARCHAR(300) NOT NULL,
+  `ancho` INT NOT NULL,
+  `formato` ENUM('webp', 'jpeg') NOT NULL,
+  `ruta_variante` VARCHAR(300) NOT NULL,
+  `nombre_variante` VARCHAR(300) NOT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `foto_variante_archivo_idx` (`ruta_archivo` ASC, `nombre_archivo` ASC, `ancho` ASC, `formato` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`trabajo_variante`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`trabajo_variante` (
+  `ruta_archivo` VARCHAR(300) NOT NULL,
+  `nombre_archivo` VARCHAR(300) NOT NULL,
+  `creado` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`ruta_archivo`, `nombre_archivo`),
+  INDEX `trabajo_variante_creado_idx` (`creado` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`estadistica_dia`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`estadistica_dia` (
+  `fecha` DATE NOT NULL,
+  `total` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`fecha`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`estadistica_tipo`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`estadistica_tipo` (
+  `tipo` ENUM('Al Paso', 'Alemana', 'Árabe', 'Argentina', 'Asiática', 'Australiana', 'Brasileña', 'Café y Snacks', 'Carnes', 'Casera', 'Chilena', 'China', 'Cocina de Autor', 'Comida Rápida', 'Completos', 'Coreana', 'Cubana', 'Española', 'Exótica', 'Francesa', 'Gringa', 'Hamburguesa', 'Helados', 'India', 'Internacional', 'Italiana', 'Latinoamericana', 'Mediterránea', 'Mexicana', 'Nikkei', 'Parrillada', 'Peruana', 'Pescados y mariscos', 'Picoteos', 'Pizzas', 'Pollos y Pavos', 'Saludable', 'Sándwiches', 'Suiza', 'Japonesa', 'Sushi', 'Tapas', 'Thai', 'Vegana', 'Vegetariana') NOT NULL,
+  `total` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`tipo`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`estadistica_mes_horario`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`estadistica_mes_horario` (
+  `mes` CHAR(7) NOT NULL,
+  `early` INT NOT NULL DEFAULT 0,
+  `midday` INT NOT NULL DEFAULT 0,
+  `evening` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`mes`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`estadistica_comuna_foto`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`estadistica_comuna_foto` (
+  `comuna_id` INT NOT NULL,
+  `total` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`comuna_id`),
+  CONSTRAINT `fk_estadistica_comuna_foto_comuna1`
+    FOREIGN KEY (`comuna_id`)
+    REFERENCES `tarea2`.`comuna` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `tarea2`.`estadistica_comuna_evento`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `tarea2`.`estadistica_comuna_evento` (
+  `comuna_id` INT NOT NULL,
+  `total` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`comuna_id`),
+  CONSTRAINT `fk_estadistica_comuna_evento_comuna1`
+    FOREIGN KEY (`comuna_id`)
+    REFERENCES `tarea2`.`comuna` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+
 SET SQL_MODE=@OLD_SQL_MODE;
 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;
 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;
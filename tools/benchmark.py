@@ -0,0 +1,386 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+benchmark.py:
+    reproducible load test of every data route and of event registration.
+
+    A separate benchmark database is created from the repository schema and
+    seeded with synthetic events, images and social networks at a given scale.
+    Requests are then driven through the WSGI application in this process, so
+    they take the same path a worker does, for every request type of
+    urlparamhandler and for multipart event registrations. Latency percentiles,
+    throughput and database queries per request are reported as JSON.
+
+    Images seeded are rows only, responses reference files that don't exist on
+    disk. Files written while benchmarking (images registered, data version and
+    metrics) go to a temporary directory removed on exit, never to those of the
+    application.
+
+    usage: python3 tools/benchmark.py --database tarea2_bench [--seed 1] seed --scale 100k
+           python3 tools/benchmark.py --database tarea2_bench [--seed 1] run [--requests 200] [--concurrency 4]
+                                                                  [--output results.json]
+"""
+
+import argparse
+import atexit
+import io
+import json
+import platform
+import random
+import re
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cgi-bin'))
+
+import mysql.connector  # noqa: E402
+
+import conf  # noqa: E402
+from conf import host, user, password, datetimeformat, dateformat  # noqa: E402
+
+repository = Path(__file__).resolve().parent.parent
+# schema and reference data loaded into benchmark database, in order
+schema_files = ['tarea2.sql', 'region-comuna.sql', 'comuna-ubicacion.sql']
+
+# events seeded by scale name
+scales = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+# rows inserted per statement while seeding
+seed_batch_size = 5_000
+# start dates of seeded events, spread over this many days
+seed_days = 730
+
+# words seeded events are named and described with, so searches find some of them
+words = ['asado', 'empanadas', 'completos', 'sushi', 'pizza', 'feria', 'mariscos', 'vegano', 'postres',
+         'cerveza', 'vino', 'parrilla', 'sopaipillas', 'ceviche', 'tacos', 'helados', 'café', 'pan',
+         'queso', 'festival', 'mercado', 'costumbrista', 'fonda', 'degustación', 'food', 'truck']
+social_networks = ['twitter', 'facebook', 'instagram', 'tiktok', 'otra']
+
+# requests of a route, built from a random generator and reference values of seeded database
+RequestBuilder = Callable[[random.Random, Dict], Dict]
+
+
+def read_statements(path: Path, database: str) -> List[str]:
+    """
+    Split a SQL script into statements, addressing benchmark database instead of tarea2.
+    """
+
+    script = path.read_text(encoding='utf-8').replace('`tarea2`', f'`{database}`')
+    script = re.sub(r'--[^\n]*', '', script)
+    return [statement.strip() for statement in script.split(';') if statement.strip()]
+
+
+def synthetic_events(rng: random.Random,
+                     count: int,
+                     comuna_ids: List[int],
+                     food_types: List[str]) -> List[Tuple]:
+    """
+    :return:
+        evento rows as (comuna id, sector, name, email, phone, start, end, description, food type).
+    """
+
+    first_day = datetime(2023, 1, 1)
+    rows = []
+    for _ in range(count):
+        start = first_day + timedelta(minutes=rng.randrange(seed_days * 24 * 60))
+        end = start + timedelta(minutes=rng.randrange(60, 8 * 60))
+        rows.append((rng.choice(comuna_ids),
+                     ' '.join(rng.choices(words, k=2)),
+                     ' '.join(rng.choices(words, k=3)),
+                     f'contacto{rng.randrange(10 ** 6)}@example.com',
+                     f'+569{rng.randrange(10 ** 8):08d}',
+                     start.strftime(datetimeformat),
+                     end.strftime(datetimeformat),
+                     ' '.join(rng.choices(words, k=rng.randrange(5, 25))),
+                     rng.choice(food_types)))
+    return rows
+
+
+def seed(database: str, scale: str, rng: random.Random) -> None:
+    """
+    Create benchmark database from repository schema and fill it with synthetic events.
+    """
+
+    cnx = mysql.connector.connect(host=host, user=user, password=password)
+    cursor = cnx.cursor()
+    cursor.execute(f'DROP DATABASE IF EXISTS `{database}`')
+    for schema_file in schema_files:
+        for statement in read_statements(repository / schema_file, database):
+            cursor.execute(statement)
+            if cursor.with_rows:
+                cursor.fetchall()
+    cnx.commit()
+
+    cursor.execute(f'USE `{database}`')
+    cursor.execute('SELECT id FROM comuna')
+    comuna_ids = [comuna_id for comuna_id, in cursor.fetchall()]
+    cursor.execute("SHOW COLUMNS FROM evento LIKE 'tipo'")
+    food_types = re.findall(r"'((?:[^']|'')*)'", cursor.fetchall()[0][1])
+
+    total = scales[scale]
+    for first in range(0, total, seed_batch_size):
+        rows = synthetic_events(rng, min(seed_batch_size, total - first), comuna_ids, food_types)
+        cursor.executemany('INSERT INTO evento (comuna_id, sector, nombre, email, celular, dia_hora_inicio, '
+                           'dia_hora_termino, descripcion, tipo) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)', rows)
+        first_id = cursor.lastrowid  # ids of a multi-row insert are consecutive
+        event_ids = range(first_id, first_id + len(rows))
+
+        images = [(f'media/{digest[:2]}/{digest[2:4]}', digest, event_id)
+                  for event_id in event_ids
+                  for digest in (f'{rng.getrandbits(256):064x}' for _ in range(rng.randrange(1, 4)))]
+        cursor.executemany('INSERT INTO foto (ruta_archivo, nombre_archivo, evento_id) VALUES (%s, %s, %s)', images)
+
+        networks = [(network, f'https://{network}.com/usuario{event_id}', event_id)
+                    for event_id in event_ids
+                    for network in rng.sample(social_networks, rng.randrange(0, 3))]
+        cursor.executemany('INSERT INTO red_social (nombre, identificador, evento_id) VALUES (%s, %s, %s)', networks)
+
+        cnx.commit()
+        print(f'{first + len(rows)} of {total} events seeded.', file=sys.stderr)
+
+    cursor.close()
+    cnx.close()
+
+    from db import EventDatabase  # imported once conf points to benchmark database
+
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        db.rebuild_statistics()
+
+
+def png_image() -> bytes:
+    """
+    :return:
+        smallest valid PNG, a single white pixel.
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b'\x00\xff\xff\xff'))
+            + chunk(b'IEND', b''))
+
+
+def multipart(fields: List[Tuple[str, str]], files: List[Tuple[str, str, bytes]]) -> Tuple[str, bytes]:
+    """
+    :return:
+        content type and body of a multipart/form-data submission.
+    """
+
+    boundary = f'benchmark{random.getrandbits(64):016x}'
+    body = io.BytesIO()
+    for name, value in fields:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, content in files:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                   f'Content-Type: image/png\r\n\r\n'.encode())
+        body.write(content + b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return f'multipart/form-data; boundary={boundary}', body.getvalue()
+
+
+def data_request(**params) -> Dict:
+    return {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/cgi-bin/dataAPI.py', 'QUERY_STRING': urlencode(params, doseq=True)}
+
+
+def random_box(rng: random.Random, reference: Dict) -> str:
+    lat, lng = rng.choice(reference['locations'])
+    size = rng.uniform(0.1, 1.0)
+    return f'{lat - size},{lng - size},{lat + size},{lng + size}'
+
+
+# request of every route, by request type of urlparamhandler
+routes: Dict[str, RequestBuilder] = {
+    'regions-comunas': lambda rng, ref: data_request(type='regions-comunas'),
+    'food-types': lambda rng, ref: data_request(type='food-types'),
+    'social-networks': lambda rng, ref: data_request(type='social-networks'),
+    'comunas-images': lambda rng, ref: data_request(type='comunas-images'),
+    'events-comuna': lambda rng, ref: data_request(type='events-comuna', comuna=rng.choice(ref['comunas'])),
+    'event': lambda rng, ref: data_request(type='event', id=rng.randint(1, max(ref['events'], 1))),
+    'events-per-day': lambda rng, ref: data_request(type='events-per-day'),
+    'events-per-type': lambda rng, ref: data_request(type='events-per-type'),
+    'events-month-daytime': lambda rng, ref: data_request(type='events-month-daytime'),
+    'events': lambda rng, ref: data_request(type='events', limit=5, offset=rng.randrange(0, 500, 5)),
+    'search': lambda rng, ref: data_request(type='search', q=rng.choice(words)),
+    'events-nearby': lambda rng, ref: data_request(type='events-nearby', bbox=random_box(rng, ref)),
+    'events-summary': lambda rng, ref: data_request(type='events-summary', bbox=random_box(rng, ref)),
+}
+
+
+def register_request(rng: random.Random, reference: Dict) -> Dict:
+    region, comuna = rng.choice(reference['region_comunas'])
+    start = datetime.now() + timedelta(days=rng.randrange(1, 60))
+    content_type, body = multipart([
+        ('region', region),
+        ('comuna', comuna),
+        ('sector', 'benchmark'),
+        ('nombre', 'Benchmark'),
+        ('email', 'benchmark@example.com'),
+        ('celular', ''),
+        ('descripcion-evento', ' '.join(rng.choices(words, k=10))),
+        ('tipo-comida', rng.choice(reference['food_types'])),
+        ('dia-hora-inicio', start.strftime(datetimeformat)),
+        ('dia-hora-termino', (start + timedelta(hours=2)).strftime(datetimeformat)),
+        ('red-social', 'https://twitter.com/benchmark'),
+    ], [('foto-comida', 'foto.png', png_image())])
+
+    return {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/cgi-bin/register_event.py',
+            'CONTENT_TYPE': content_type, 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body)}
+
+
+routes['register'] = register_request
+
+
+def server_questions(cursor) -> int:
+    """
+    :return:
+        statements server has executed for every client, counting this one.
+    """
+
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+    return int(cursor.fetchall()[0][1])
+
+
+def percentile(latencies: List[float], rank: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method='inclusive')[rank - 1]
+
+
+def measure(application, build: RequestBuilder, rng: random.Random, reference: Dict,
+            requests: int, concurrency: int, status_cursor) -> Dict:
+    """
+    Drive a route with a number of requests, several at a time.
+
+    :return:
+        latency percentiles in milliseconds, throughput and queries per request of route.
+    """
+
+    environs = [build(rng, reference) for _ in range(requests)]
+    errors = []
+
+    def call(environ: Dict) -> float:
+        statuses = []
+        began = time.perf_counter()
+        body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+        elapsed = time.perf_counter() - began
+        if not statuses[0].startswith(('200', '304')) or (environ['REQUEST_METHOD'] == 'POST'
+                                                            and not json.loads(body)[0]):
+            errors.append(statuses[0])
+        return elapsed
+
+    call(build(rng, reference))  # warm up statements and caches of route
+    errors.clear()
+
+    questions = server_questions(status_cursor)
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(call, environs))
+    elapsed = time.perf_counter() - began
+    queries = server_questions(status_cursor) - questions - 1  # status query itself is counted
+
+    return {
+        'requests': requests,
+        'errors': len(errors),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'throughput_rps': round(requests / elapsed, 2),
+        'queries_per_request': round(queries / requests, 2),
+    }
+
+
+def run(database: str, requests: int, concurrency: int, rng: random.Random) -> Dict:
+    """
+    Measure every route against benchmark database.
+    """
+
+    from db import EventDatabase  # imported once conf points to benchmark database
+    from pool import close_pools
+    from wsgi import application
+
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        data = db.reference_data
+        events = db.event_count
+    reference = {
+        'events': events,
+        'comunas': [name for _, name, _ in data.comunas],
+        'region_comunas': list(data.region_comuna_ids),
+        'food_types': data.food_types,
+    }
+
+    status_cnx = mysql.connector.connect(host=host, user=user, password=password)
+    status_cursor = status_cnx.cursor()
+    status_cursor.execute(f'SELECT ST_Y(ubicacion), ST_X(ubicacion) FROM `{database}`.comuna')
+    reference['locations'] = status_cursor.fetchall()
+    try:
+        results = {route: measure(application, build, rng, reference, requests, concurrency, status_cursor)
+                   for route, build in routes.items()}
+    finally:
+        status_cursor.close()
+        status_cnx.close()
+        close_pools()
+
+    return {
+        'database': database,
+        'events': events,
+        'requests_per_route': requests,
+        'concurrency': concurrency,
+        'date': datetime.now().strftime(dateformat),
+        'python': platform.python_version(),
+        'routes': results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Seed a benchmark database and measure every route against it.')
+    parser.add_argument('--database', default='tarea2_bench', help='benchmark database, dropped when seeded')
+    parser.add_argument('--seed', type=int, default=1, help='random seed, same seed gives same data and requests')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='create benchmark database with synthetic events')
+    seed_parser.add_argument('--scale', choices=list(scales), default='10k', help='number of events seeded')
+
+    run_parser = commands.add_parser('run', help='measure every route')
+    run_parser.add_argument('--requests', type=int, default=200, help='requests measured per route')
+    run_parser.add_argument('--concurrency', type=int, default=4, help='requests in flight at a time')
+    run_parser.add_argument('--output', type=Path, help='file results are written to, standard output otherwise')
+
+    args = parser.parse_args()
+    if args.database == conf.database:
+        parser.error('benchmark database must not be the application database.')
+    conf.database = args.database  # modules imported from now on connect to benchmark database
+
+    # and write their files apart from application ones, directory is removed after metrics are flushed at exit
+    workspace = tempfile.TemporaryDirectory(prefix='benchmark-')
+    atexit.register(workspace.cleanup)
+    conf.media_root = str(Path(workspace.name) / 'media')
+    conf.data_version_path = str(Path(workspace.name) / 'media' / '.data-version')
+    conf.metrics_path = str(Path(workspace.name) / 'metrics' / 'metrics.json')
+
+    rng = random.Random(args.seed)
+    if args.command == 'seed':
+        seed(args.database, args.scale, rng)
+        print(f'{scales[args.scale]} events seeded in {args.database}.', file=sys.stderr)
+        return
+
+    results = json.dumps(run(args.database, args.requests, args.concurrency, rng), indent=2)
+    if args.output:
+        args.output.write_text(results + '\n')
+    else:
+        print(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+collect_media.py:
+    remove stored images that no foto row references anymore, e.g. images of
+    registrations that were rolled back, and temporary files left by processes
+    killed while writing an image. Recent files are kept, since they may belong
+    to a registration still in progress.
+
+    usage: python3 tools/collect_media.py [--older-than SECONDS]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cgi-bin'))
+
+from conf import host, user, password, database, media_grace_period  # noqa: E402
+from db import EventDatabase  # noqa: E402
+from media import collect_images, collect_temp_files  # noqa: E402
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Remove images not referenced by any event.')
+    parser.add_argument('--older-than', type=float, default=media_grace_period,
+                        help='seconds since last modification for an image to be removed')
+    args = parser.parse_args()
+
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        removed = collect_images(args.older_than, db.get_referenced_images, db.delete_variants)
+    removed_temp = collect_temp_files(args.older_than)
+
+    print(f'{removed} unreferenced images removed, {removed_temp} temporary files removed.')
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+import_events.py:
+    bulk import of events from a CSV or JSON-lines file.
+
+    Every row is validated with the same rules as the event form, and valid rows
+    are registered in batches, each one inside a single transaction. Columns are
+    named as form fields (region, comuna, sector, nombre, email, celular,
+    descripcion-evento, tipo-comida, dia-hora-inicio, dia-hora-termino,
+    red-social, foto-comida). Images are paths to local files, relative to the
+    input file. In CSV, several social networks or images are separated by '|',
+    in JSON-lines they are given as lists.
+
+    Rows that can't be imported are reported as JSON lines on standard output.
+
+    usage: python3 tools/import_events.py events.csv [--batch-size 500]
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cgi-bin'))
+
+import mysql.connector  # noqa: E402
+
+from conf import host, user, password, database  # noqa: E402
+from db import EventDatabase  # noqa: E402
+from validation import event_validator  # noqa: E402
+
+# fields that can hold several values
+list_fields = ['red-social', 'foto-comida']
+# separator of several values in a CSV cell
+csv_separator = '|'
+
+
+class LocalFile:
+    """
+    Image from local disk, exposing the attributes of a cgi FieldStorage upload.
+
+    The file is opened on first access and can be closed and reopened, so that
+    a batch of rows doesn't hold a descriptor per image.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Constructor of LocalFile.
+
+        :param path:
+            path to image file.
+        """
+
+        self.path = path
+        self.filename = path.name
+        self._file = None
+
+    @property
+    def file(self):
+        """
+        :return:
+            property returning image opened for binary reading.
+        """
+
+        if self._file is None or self._file.closed:
+            self._file = open(self.path, 'rb')
+        return self._file
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class RowData:
+    """
+    Imported row, exposing the cgi FieldStorage methods that form validation reads.
+    """
+
+    def __init__(self, row: Dict[str, Union[str, List[str]]], base_dir: Path):
+        """
+        Constructor of RowData.
+
+        :param row:
+            values of row by field name.
+        :param base_dir:
+            directory that image paths are relative to.
+        """
+
+        self._values: Dict[str, List[str]] = {}
+        for field, value in row.items():
+            if value is None:
+                continue
+            if isinstance(value, list):
+                values = [str(item) for item in value]
+            elif field in list_fields:
+                values = [item.strip() for item in str(value).split(csv_separator) if item.strip()]
+            else:
+                values = [str(value)]
+            self._values[field] = values
+
+        self.images = [LocalFile(base_dir / image) for image in self._values.get('foto-comida', [])]
+        self.errors = {
+            'foto-comida': [(False, f'Archivo {image.path} no encontrado.') for image in self.images
+                            if not image.path.is_file()]
+        }
+
+    def getfirst(self, key: str, default=None):
+        values = self._values.get(key)
+        return values[0] if values else default
+
+    def getlist(self, key: str) -> List[str]:
+        return list(self._values.get(key, []))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __getitem__(self, key: str):
+        if key == 'foto-comida':
+            return self.images
+        return self.getfirst(key)
+
+    def close(self) -> None:
+        for image in self.images:
+            image.close()
+
+
+def read_rows(path: Path) -> Iterator[Union[Dict, str]]:
+    """
+    Stream rows of a CSV or JSON-lines file, one at a time.
+
+    :param path:
+        path to file, format is chosen by extension (.csv, otherwise JSON-lines).
+
+    :return:
+        iterator over rows as dictionaries, or an error message for a line that isn't a JSON object.
+    """
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            yield from csv.DictReader(f)
+            return
+
+        for line in f:
+            if not line.strip():
+                continue
+
+            try:
+                values = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f'Línea no es JSON válido: {e}.'
+                continue
+
+            yield values if isinstance(values, dict) else 'Línea no es un objeto JSON.'
+
+
+def report(row_number: int, errors: Dict) -> None:
+    """
+    Print errors of a row that was not imported.
+    """
+
+    print(json.dumps({'row': row_number, 'errors': errors}))
+
+
+def flush(db: EventDatabase, batch: List[Tuple[int, RowData]]) -> int:
+    """
+    Register a batch of valid rows in a single transaction.
+
+    :return:
+        number of rows imported, zero if batch was rolled back.
+    """
+
+    if not batch:
+        return 0
+
+    try:
+        db.register_events([row for _, row in batch])
+        return len(batch)
+    except (mysql.connector.Error, OSError) as e:
+        for row_number, _ in batch:
+            report(row_number, {'database': str(e)})
+        return 0
+    finally:
+        for _, row in batch:
+            row.close()
+        batch.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Import events from a CSV or JSON-lines file.')
+    parser.add_argument('path', type=Path, help='file with one event per row')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows registered per transaction')
+    args = parser.parse_args()
+
+    base_dir = args.path.resolve().parent
+    rows = imported = 0
+    batch: List[Tuple[int, RowData]] = []
+
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        reference = db.reference_data
+        for row_number, values in enumerate(read_rows(args.path), start=1):
+            rows = row_number
+            if isinstance(values, str):
+                report(row_number, {'linea': values})
+                continue
+
+            row = RowData(values, base_dir)
+
+            if row.errors['foto-comida']:
+                report(row_number, row.errors)
+                continue
+
+            valid, checks = event_validator.validate(row, reference)
+            row.close()  # files are opened again when saved
+
+            if not valid:
+                report(row_number, {field: check for field, check in checks.items() if not check[0]})
+                continue
+
+            batch.append((row_number, row))
+            if len(batch) >= args.batch_size:
+                imported += flush(db, batch)
+
+        imported += flush(db, batch)
+
+    print(f'{imported} events imported, {rows - imported} rows rejected.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+rebuild_statistics.py:
+    recompute statistics tables from registered events, e.g. after creating them
+    on an existing database or loading events by other means.
+
+    usage: python3 tools/rebuild_statistics.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cgi-bin'))
+
+from conf import host, user, password, database  # noqa: E402
+from db import EventDatabase  # noqa: E402
+
+
+if __name__ == '__main__':
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        db.rebuild_statistics()
+
+    print('Statistics rebuilt.')
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+variant_worker.py:
+    generate downscaled variants of uploaded images, in background.
+
+    Registrations queue every stored image in trabajo_variante within their
+    transaction, this worker takes pending jobs, writes the variants next to the
+    original image and records them in foto_variante. Jobs are locked while
+    processed, so several workers can run at once. Requires Pillow.
+
+    usage: python3 tools/variant_worker.py [--once] [--batch-size 20] [--interval SECONDS]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cgi-bin'))
+
+from conf import host, user, password, database, variant_poll_interval  # noqa: E402
+from db import EventDatabase, bump_data_version  # noqa: E402
+from media import Image, create_variants  # noqa: E402
+
+
+def process(db: EventDatabase, batch_size: int) -> int:
+    """
+    Generate variants for a batch of pending jobs.
+
+    :return:
+        number of jobs processed.
+    """
+
+    jobs = db.claim_variant_jobs(batch_size)
+    db.save_variants({(directory, name): create_variants(directory, name) for directory, name in jobs})
+    return len(jobs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate variants of uploaded images.')
+    parser.add_argument('--once', action='store_true', help='exit when there are no pending jobs')
+    parser.add_argument('--batch-size', type=int, default=20, help='jobs taken per transaction')
+    parser.add_argument('--interval', type=float, default=variant_poll_interval,
+                        help='seconds to wait when there are no pending jobs')
+    args = parser.parse_args()
+
+    if Image is None:
+        sys.exit('Pillow is required to generate variants.')
+
+    with EventDatabase(host=host, user=user, password=password, database=database) as db:
+        processed = 0
+        while True:
+            count = process(db, args.batch_size)
+            processed += count
+            if count:
+                bump_data_version()  # event responses now include variants
+                print(f'{processed} images processed.', file=sys.stderr)
+            elif args.once:
+                break
+            else:
+                time.sleep(args.interval)